@@ -0,0 +1,164 @@
+"""Benchmark for the regional council SOS requests.
+
+Benchmarks:
+- windows: the original fixed two month observation window against the narrow
+  windows now requested first (see regionalCouncilApi.OBSERVATION_WINDOWS),
+  payload size and the time to parse it and take the latest value.
+- parser: json.loads of the whole payload against sosParser's streaming parse,
+  time and peak memory, checking both find the same latest observations.
+
+By default the payloads are generated locally in the SOS JSON layout, with one
+observation per sensor interval. With --live the real BOPRC service is called
+instead, and parser --fixture checks recorded payload files offline.
+
+Usage:
+    python -m app.benchmark windows [--live]
+    python -m app.benchmark parser [--fixture payload.json ...]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from . import regionalCouncilApi as regional
+from . import sosParser
+
+# (name, offering path, minutes between observations) of each series.
+SERIES = [
+    ("tide", regional.TIDE_HEIGHT_PATH, 5),
+    ("waterTemp", regional.WATER_TEMP_PATH, 15),
+    ("enterococci", regional.ENTEROCOCCI_PATH, 7 * 24 * 60),
+]
+
+WINDOW_DAYS = {"PT1H": 1 / 24, "PT6H": 6 / 24, "P1D": 1, "P2D": 2, "P14D": 14, "P2M": 61}
+
+
+def sos_payload(days, interval_minutes):
+    """Build an SOS GetObservation JSON body with observations every interval over the last days."""
+    end = datetime(2026, 1, 15, 12, tzinfo=timezone(timedelta(hours=13)))
+    count = max(1, int(days * 24 * 60 / interval_minutes))
+    values = [
+        [(end - timedelta(minutes=interval_minutes * i)).isoformat(timespec="milliseconds"), round(1.5 + (i % 97) / 100, 3)]
+        for i in reversed(range(count))
+    ]
+    return json.dumps(
+        {
+            "request": "GetObservation",
+            "version": "2.0.0",
+            "service": "SOS",
+            "observations": [
+                {
+                    "type": "http://www.opengis.net/def/observationType/OGC-OM/2.0/OM_SWEArrayObservation",
+                    "phenomenonTime": [values[0][0], values[-1][0]],
+                    "result": {
+                        "fields": [
+                            {"name": "phenomenonTime", "type": "time"},
+                            {"name": "value", "type": "quantity"},
+                        ],
+                        "values": values,
+                    },
+                }
+            ],
+        }
+    ).encode()
+
+
+def parse_latest(body):
+    """Parse a payload and take the latest value, as regionalCouncilApi does."""
+    values = json.loads(body)["observations"][0]["result"]["values"]
+    return values[-1][-1]
+
+
+def parse_streaming(body, keep=1):
+    """Parse a payload with sosParser, fed in response-sized chunks."""
+    chunks = (body[i:i + sosParser.CHUNK_SIZE] for i in range(0, len(body), sosParser.CHUNK_SIZE))
+    return sosParser.last_values(chunks, keep)
+
+
+def time_parse(body, repeat, parse=parse_latest):
+    """Return the best parse time in milliseconds across repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(body)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def peak_memory(body, parse):
+    """Return the peak memory in KiB allocated while parsing."""
+    tracemalloc.start()
+    parse(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def fetch(path, window):
+    """Fetch a live payload, returning (body, seconds taken)."""
+    url = regional.__generate_url(path, window)
+    start = time.perf_counter()
+    response = httpx.get(url, timeout=60, follow_redirects=True)
+    response.raise_for_status()
+    return response.content, time.perf_counter() - start
+
+
+def bench_windows(args):
+    print(f"{'series':<12} {'window':<6} {'bytes':>12} {'parse ms':>10}" + (f" {'fetch s':>8}" if args.live else ""))
+    for name, path, interval in SERIES:
+        narrow = regional.OBSERVATION_WINDOWS[path][0]
+        results = []
+        for window in ("P2M", narrow):
+            if args.live:
+                body, fetch_seconds = fetch(path, window)
+            else:
+                body, fetch_seconds = sos_payload(WINDOW_DAYS[window], interval), None
+            parse_ms = time_parse(body, args.repeat)
+            results.append((len(body), parse_ms))
+            line = f"{name:<12} {window:<6} {len(body):>12,} {parse_ms:>10.3f}"
+            if fetch_seconds is not None:
+                line += f" {fetch_seconds:>8.2f}"
+            print(line)
+        (before_bytes, before_ms), (after_bytes, after_ms) = results
+        print(f"{'':<12} {'':<6} {before_bytes / after_bytes:>11.0f}x {before_ms / after_ms:>9.0f}x smaller/faster")
+
+
+def bench_parser(args):
+    if args.fixture:
+        payloads = [(path, open(path, "rb").read()) for path in args.fixture]
+    else:
+        payloads = [(name, sos_payload(WINDOW_DAYS["P2M"], interval)) for name, _, interval in SERIES]
+
+    print(f"{'payload':<24} {'bytes':>12} {'parser':<8} {'parse ms':>10} {'peak KiB':>10}")
+    for name, body in payloads:
+        expected = json.loads(body)["observations"][0]["result"]["values"][-args.keep:]
+        actual = parse_streaming(body, args.keep)
+        if actual != expected:
+            raise SystemExit(f"Mismatch on {name}: expected {expected}, got {actual}")
+        for label, parse in (("json", parse_latest), ("stream", lambda b: parse_streaming(b, args.keep))):
+            parse_ms = time_parse(body, args.repeat, parse)
+            print(f"{name:<24} {len(body):>12,} {label:<8} {parse_ms:>10.3f} {peak_memory(body, parse):>10.1f}")
+    print(f"Streaming parse matches json.loads on every payload (last {args.keep})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SOS requests")
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    windows = sub.add_parser("windows", help="Payload size and parse time by time window")
+    windows.add_argument("--live", action="store_true", help="Fetch from the BOPRC SOS service")
+    windows.add_argument("--repeat", type=int, default=20, help="Parse runs to take the best of")
+    windows.set_defaults(func=bench_windows)
+
+    streaming = sub.add_parser("parser", help="json.loads vs streaming parse, time and peak memory")
+    streaming.add_argument("--fixture", nargs="+", help="Recorded SOS payload files to parse instead")
+    streaming.add_argument("--keep", type=int, default=1, help="Trailing observations to keep")
+    streaming.add_argument("--repeat", type=int, default=5, help="Parse runs to take the best of")
+    streaming.set_defaults(func=bench_parser)
+
+    args = parser.parse_args()
+    args.func(args)
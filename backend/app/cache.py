@@ -0,0 +1,144 @@
+"""Upstream response cache for SafeToManu.
+
+Caches the values fetched from NIWA, the regional council SOS service and
+MetOcean so a request only reaches them when the cached value is too old.
+
+Each source has a time to live (TTL) matching how often it actually changes,
+and a stale window after that:
+    - Within the TTL the cached value is returned (hit).
+    - Within the stale window the cached value is returned straight away and a
+      background task fetches a new one (stale hit).
+    - Past that, or with nothing cached, the caller fetches it (miss).
+Concurrent misses for the same value share a single upstream call. A failed
+background refresh keeps the old value; None results aren't cached.
+
+The cache is used from the event loop only, so it needs no locking.
+"""
+
+import asyncio
+import os
+import time
+from functools import wraps
+
+# (ttl, stale) seconds per source. UV is hourly, enterococci is a weekly lab
+# sample, tide and water temperature update every few minutes.
+SOURCE_TTLS = {
+    "uv": (int(os.getenv("CACHE_TTL_UV", "600")), 3600),
+    "tide": (int(os.getenv("CACHE_TTL_TIDE", "120")), 600),
+    "waterTemp": (int(os.getenv("CACHE_TTL_WATER_TEMP", "300")), 1800),
+    "enterococci": (int(os.getenv("CACHE_TTL_ENTEROCOCCI", "3600")), 86400),
+    "wind": (int(os.getenv("CACHE_TTL_WIND", "600")), 3600),
+}
+
+COUNTERS = ("hits", "stale_hits", "misses", "coalesced", "refreshes", "errors")
+
+
+def consume_exception(task):
+    """Done callback marking a background task's exception as retrieved."""
+    if not task.cancelled():
+        task.exception()
+
+
+class TTLCache:
+    """Cache of coroutine results with a TTL, stale-while-revalidate and request coalescing."""
+
+    def __init__(self):
+        self._entries = {}  # key -> (value, fetched_at)
+        self._inflight = {}  # key -> Task of the upstream call in progress
+        self._counters = {}  # source -> {counter: int}
+
+    def _count(self, source, counter):
+        self._counters.setdefault(source, dict.fromkeys(COUNTERS, 0))[counter] += 1
+
+    async def get(self, source, key, fetch, ttl, stale):
+        """Return the cached value for key, awaiting fetch() if it is missing or too old.
+
+        Args:
+            source (str): Source name the counters are kept under
+            key (tuple): Cache key
+            fetch (callable): Returns a coroutine fetching the value from upstream
+            ttl (float): Seconds the value is fresh for
+            stale (float): Seconds after the TTL the value may still be served while refreshing
+
+        Returns:
+            The cached or fetched value
+
+        Raises:
+            Exception: Whatever fetch() raised, if nothing usable is cached
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < ttl:
+                self._count(source, "hits")
+                return value
+            if age < ttl + stale:
+                self._count(source, "stale_hits")
+                if key not in self._inflight:
+                    self._count(source, "refreshes")
+                    task = self._inflight[key] = asyncio.create_task(self._fetch(source, key, fetch))
+                    task.add_done_callback(consume_exception)
+                return value
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(source, "coalesced")
+        else:
+            self._count(source, "misses")
+            task = self._inflight[key] = asyncio.create_task(self._fetch(source, key, fetch))
+            task.add_done_callback(consume_exception)
+        # Shielded so a caller giving up doesn't cancel the fetch the others are waiting on.
+        return await asyncio.shield(task)
+
+    async def _fetch(self, source, key, fetch):
+        try:
+            value = await fetch()
+        except Exception:
+            self._count(source, "errors")
+            raise
+        finally:
+            del self._inflight[key]
+        if value is not None:
+            self._entries[key] = (value, time.monotonic())
+        return value
+
+    def stats(self):
+        """Return hit/miss counters per source and the age of each cached value.
+
+        Returns:
+            dict: {"sources": {source: {counter: int}}, "entries": {key: age_seconds}}
+        """
+        now = time.monotonic()
+        return {
+            "sources": {source: dict(counts) for source, counts in self._counters.items()},
+            "entries": {
+                ":".join(map(str, key)): round(now - fetched_at, 1)
+                for key, (_, fetched_at) in self._entries.items()
+            },
+        }
+
+    def clear(self):
+        """Drop every cached value and reset the counters."""
+        self._entries.clear()
+        self._counters.clear()
+
+
+upstream_cache = TTLCache()
+
+
+def cached(source):
+    """Decorator caching an async fetch function's results under a source from SOURCE_TTLS.
+
+    Args:
+        source (str): Key into SOURCE_TTLS, also the name counters are kept under
+    """
+    ttl, stale = SOURCE_TTLS[source]
+
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args):
+            return await upstream_cache.get(source, (source, *args), lambda: fn(*args), ttl, stale)
+
+        return wrapper
+
+    return decorator
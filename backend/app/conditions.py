@@ -0,0 +1,184 @@
+"""Background conditions poller for SafeToManu.
+
+Keeps an in-memory snapshot of every environmental reading (UV, tide height,
+water temperature, enterococci and wind), refreshed by a background task per
+source on that source's own cadence. The condition endpoints and the warning
+level read the snapshot instead of calling the government APIs, so request
+latency doesn't depend on them and upstream calls stay constant however many
+kiosks are open.
+
+The snapshot is replaced as a whole on every update, never changed in place,
+so a reader always sees one consistent set of values. A source whose latest
+refresh failed keeps its last good value and is reported as stale.
+"""
+
+import asyncio
+import os
+import time
+
+from . import metServiceApi as met
+from . import regionalCouncilApi as regional
+from . import uvApi
+from .cache import SOURCE_TTLS, consume_exception
+from .etags import make_etag
+
+LAT = "-37.68272674985233"
+LON = "176.17082423934843"
+
+# Seconds before retrying a source whose last fetch failed.
+RETRY_INTERVAL = 30
+# Seconds to wait for a source that has to be fetched on request before leaving it out.
+FETCH_TIMEOUT = float(os.getenv("CONDITIONS_FETCH_TIMEOUT", "5"))
+# Set CONDITIONS_POLLER=0 to fetch on request (through the cache) instead.
+POLLER_ENABLED = os.getenv("CONDITIONS_POLLER", "1") != "0"
+
+
+class ConditionsPoller:
+    """Refreshes each registered source in its own task and keeps the latest values."""
+
+    def __init__(self):
+        self._sources = {}
+        self._snapshot = {}
+        self._tasks = []
+
+    def add(self, name, fetch, interval, *args):
+        """Register a source.
+
+        Args:
+            name (str): Source name in the snapshot
+            fetch (callable): Async fetch function, possibly wrapped by cache.cached()
+            interval (float): Seconds between refreshes
+            *args: Arguments passed to fetch
+        """
+        self._sources[name] = (fetch, interval, args)
+
+    def start(self):
+        """Start a polling task per source on the running event loop. Does nothing if already started."""
+        if self._tasks:
+            return
+        for name in self._sources:
+            self._tasks.append(asyncio.create_task(self._poll(name), name=f"poll-{name}"))
+
+    async def stop(self):
+        """Cancel the polling tasks."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _poll(self, name):
+        interval = self._sources[name][1]
+        while True:
+            ok = await self.refresh(name)
+            await asyncio.sleep(interval if ok else min(interval, RETRY_INTERVAL))
+
+    async def refresh(self, name):
+        """Fetch one source from upstream now and update the snapshot.
+
+        Returns:
+            bool: True if a value was fetched
+        """
+        fetch, _, args = self._sources[name]
+        # The poller is the cache for these, so go straight to upstream.
+        upstream = getattr(fetch, "__wrapped__", fetch)
+        previous = self._snapshot.get(name, {})
+        try:
+            value = await upstream(*args)
+            error = None if value is not None else "No value returned"
+        except Exception as e:
+            value, error = None, str(e)
+        if value is None:
+            # Keep the last good value, just record why it wasn't replaced.
+            entry = {"value": previous.get("value"), "updated": previous.get("updated"), "error": error}
+        else:
+            entry = {"value": value, "updated": time.time(), "error": None}
+        snapshot = dict(self._snapshot)
+        snapshot[name] = entry
+        self._snapshot = snapshot
+        return error is None
+
+    def snapshot(self):
+        """Return the current snapshot: {name: {"value", "updated", "error"}}. Don't modify it."""
+        return self._snapshot
+
+    def stale(self, names):
+        """Return the sources whose latest refresh failed, so their value is the last good one."""
+        snapshot = self._snapshot
+        return [name for name in names if name in snapshot and snapshot[name]["error"] is not None]
+
+    def validators(self, names):
+        """Return the ETag, max-age and staleness for a response built from these sources' latest values.
+
+        The ETag only changes when one of the values does, and max-age is the time
+        left until the first of the sources is due to be polled again, 0 if any
+        of them is stale.
+
+        Args:
+            names (list): Source names
+
+        Returns:
+            tuple: (etag, max_age, stale), (None, 0, False) if any of the sources hasn't been polled yet
+        """
+        snapshot = self._snapshot
+        entries = [snapshot.get(name) for name in names]
+        if any(entry is None or entry["updated"] is None for entry in entries):
+            return None, 0, False
+        stale = bool(self.stale(names))
+        now = time.time()
+        max_age = min(
+            self._sources[name][1] - (now - entry["updated"]) for name, entry in zip(names, entries)
+        )
+        etag = make_etag(list(names), [entry["value"] for entry in entries])
+        return etag, 0 if stale else max(0, int(max_age)), stale
+
+    async def get(self, name):
+        """Return the latest value of a source.
+
+        Falls back to fetching through the cache if the source hasn't been polled
+        yet, e.g. just after startup or with the poller disabled, giving up after
+        FETCH_TIMEOUT.
+
+        Returns:
+            The latest value, None if the source has never returned one or couldn't be fetched
+        """
+        return (await self.get_many([name]))[name]
+
+    async def get_many(self, names, timeout=FETCH_TIMEOUT):
+        """Return the latest values of several sources.
+
+        Sources that haven't been polled yet are fetched concurrently, and any that
+        take longer than the timeout are left as None, so one slow sensor gives a
+        partial result instead of holding up the rest. A late fetch still finishes
+        in the background and fills the cache for the next request.
+
+        Args:
+            names (list): Source names
+            timeout (float): Seconds to wait for sources fetched on request
+
+        Returns:
+            dict: {name: value or None}
+        """
+        snapshot = self._snapshot
+        values, pending = {}, {}
+        for name in names:
+            entry = snapshot.get(name)
+            if entry is not None:
+                values[name] = entry["value"]
+            else:
+                fetch, _, args = self._sources[name]
+                pending[name] = asyncio.ensure_future(fetch(*args))
+                pending[name].add_done_callback(consume_exception)
+        if pending:
+            await asyncio.wait(pending.values(), timeout=timeout)
+        for name, task in pending.items():
+            ok = task.done() and not task.cancelled() and task.exception() is None
+            values[name] = task.result() if ok else None
+        return values
+
+
+poller = ConditionsPoller()
+poller.add("uv", uvApi.get_current_uv, SOURCE_TTLS["uv"][0], LAT, LON)
+poller.add("tide", regional.get_tide_height, SOURCE_TTLS["tide"][0])
+poller.add("waterTemp", regional.get_water_temprature, SOURCE_TTLS["waterTemp"][0])
+poller.add("enterococci", regional.get_enterococci, SOURCE_TTLS["enterococci"][0])
+poller.add("wind", met.get_wind_10m, SOURCE_TTLS["wind"][0], LAT, LON)
@@ -0,0 +1,126 @@
+"""Aggregated dashboard data for SafeToManu.
+
+The home page used to call one endpoint per widget, and the warning level
+re-read the tide, water temperature and enterococci the widgets had just
+fetched. build_dashboard() answers for every widget at once: the conditions
+come from a single poller snapshot, the splash scoring API's stats are fetched
+once for both the latest jump and the total, and the warning level is worked
+out from the same conditions. Every source is fetched at most once.
+
+Fields whose value is the last known good one, because the upstream couldn't
+be refreshed, are listed in "stale".
+"""
+
+import asyncio
+
+from . import manuSplashApi as splash
+from . import warningLevel
+from .conditions import LAT, LON, poller
+
+# Dashboard field -> condition sources it is built from.
+CONDITION_FIELDS = {
+    "uv": ("uv",),
+    "tideHeight": ("tide",),
+    "waterTemp": ("waterTemp",),
+    "enterococci": ("enterococci",),
+    "windSpeed": ("wind",),
+    "warningLevel": warningLevel.WARNING_SOURCES,
+}
+SPLASH_FIELDS = ("leaderboard", "latestJump", "totalJumps")
+FIELDS = (*CONDITION_FIELDS, *SPLASH_FIELDS)
+
+
+def parse_fields(selector):
+    """Parse a comma separated field selector.
+
+    Args:
+        selector (str): e.g. "uv,tideHeight", None or empty for every field
+
+    Returns:
+        tuple: Selected fields, in FIELDS order
+
+    Raises:
+        ValueError: If a field isn't one of FIELDS
+    """
+    if not selector:
+        return FIELDS
+    requested = {field.strip() for field in selector.split(",") if field.strip()}
+    unknown = requested.difference(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown dashboard fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in FIELDS if field in requested)
+
+
+async def _optional(fetch):
+    """Await fetch(), returning None instead of raising so one source can't fail the rest."""
+    try:
+        return await fetch()
+    except Exception:
+        return None
+
+
+async def _nothing():
+    return None
+
+
+async def build_dashboard(fields=FIELDS):
+    """Return the data for the selected dashboard fields, each source fetched at most once.
+
+    Each field has the same value as its own endpoint returns (uv as /api/uv,
+    warningLevel as /api/warning-level, ...). A field whose source has no value
+    (timed out, failed or no recent observation) is listed in "unavailable", and
+    one served from its last known good value in "stale".
+
+    Args:
+        fields (tuple): Fields to include, from FIELDS
+
+    Returns:
+        dict: {field: value, ..., "unavailable": list of fields, "stale": list of fields}
+    """
+    sources = list(dict.fromkeys(source for field in fields for source in CONDITION_FIELDS.get(field, ())))
+    wants_stats = "latestJump" in fields or "totalJumps" in fields
+
+    # Conditions and both splash calls run concurrently.
+    metrics, leaderboard, stats = await asyncio.gather(
+        poller.get_many(sources) if sources else _nothing(),
+        _optional(lambda: splash.fetch(splash.LEADERBOARD_PATH)) if "leaderboard" in fields else _nothing(),
+        _optional(lambda: splash.fetch(splash.STATS_PATH)) if wants_stats else _nothing(),
+    )
+    metrics = metrics or {}
+    stale_sources = set(poller.stale(sources))
+    stale_splash = {
+        "leaderboard": leaderboard is not None and leaderboard[3],
+        "latestJump": stats is not None and stats[3],
+        "totalJumps": stats is not None and stats[3],
+    }
+    leaderboard = leaderboard[0] if leaderboard is not None else None
+    stats = stats[0] if stats is not None else None
+
+    builders = {
+        "uv": lambda: {"lat": LAT, "long": LON, "uv": metrics["uv"]},
+        "tideHeight": lambda: {"height": metrics["tide"]},
+        "waterTemp": lambda: {"temp": metrics["waterTemp"]},
+        "enterococci": lambda: {"safteyLevel": metrics["enterococci"]},
+        "windSpeed": lambda: {"speed": metrics["wind"]},
+        "warningLevel": lambda: warningLevel.warning_level(metrics),
+        "leaderboard": lambda: leaderboard,
+        "latestJump": lambda: splash.latest_jump(stats) if stats is not None else None,
+        "totalJumps": lambda: splash.total_jumps(stats) if stats is not None else None,
+    }
+    dashboard = {field: builders[field]() for field in fields}
+
+    unavailable = []
+    for field in fields:
+        if field in SPLASH_FIELDS:
+            missing = dashboard[field] is None
+        else:
+            # The warning level still has a value with missing sources; it lists them itself.
+            missing = field != "warningLevel" and any(metrics[source] is None for source in CONDITION_FIELDS[field])
+        if missing:
+            unavailable.append(field)
+    dashboard["unavailable"] = unavailable
+    dashboard["stale"] = [
+        field for field in fields
+        if stale_splash.get(field) or stale_sources.intersection(CONDITION_FIELDS.get(field, ()))
+    ]
+    return dashboard
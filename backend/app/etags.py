@@ -0,0 +1,65 @@
+"""Conditional GET support for SafeToManu's API.
+
+Responses carry a strong ETag derived from the version of the data they were
+built from, and a Cache-Control max-age matching how long until that data is
+next refreshed. A client sending the ETag back in If-None-Match gets 304 Not
+Modified with no body. The ETag is always worked out from data already in
+memory, so answering a revalidation never touches an upstream API.
+"""
+
+import hashlib
+import json
+import re
+
+from fastapi.responses import JSONResponse, Response
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def make_etag(*parts):
+    """Return a strong ETag for the given JSON serialisable version parts."""
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def max_age(cache_control):
+    """Return the max-age of a Cache-Control header value, 0 if it has none."""
+    match = MAX_AGE.search(cache_control or "")
+    return int(match[1]) if match else 0
+
+
+def matches(request, etag):
+    """Return True if the request's If-None-Match includes etag.
+
+    Weak comparison, as RFC 9110 asks for If-None-Match, so a W/ prefix a proxy
+    added still matches.
+    """
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+def respond(request, etag, max_age, content, stale=False):
+    """Return content as JSON, or 304 Not Modified if the client already has this version.
+
+    Args:
+        request (Request): The incoming request
+        etag (str): ETag of content, None to send it untagged
+        max_age (int): Seconds the client may use the response without revalidating
+        content: JSON serialisable response body
+        stale (bool): content is a last known good value the upstream couldn't refresh,
+            flagged with an X-Stale: true header
+
+    Returns:
+        Response: 304 with the validators, or a JSONResponse of content
+    """
+    headers = {"Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "no-cache"}
+    if stale:
+        headers["X-Stale"] = "true"
+    if etag is not None:
+        headers["ETag"] = etag
+        if matches(request, etag):
+            return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
@@ -0,0 +1,299 @@
+"""Shared HTTP clients for SafeToManu's upstream APIs.
+
+Every call to NIWA, MetOcean, the regional council SOS service and the splash
+scoring API goes through one long-lived async httpx client per upstream, so
+connections are kept alive and reused instead of opening a new
+TCP (and TLS) connection per request, and a request waiting on an upstream
+doesn't hold a thread. HTTP/2 is offered to HTTPS upstreams when the h2 package is installed
+and used if the server accepts it.
+
+Every request has a connect timeout, a read timeout and an overall deadline
+that includes waiting for a free connection, so a hung upstream can only hold a
+request for a bounded time. After repeated failures an upstream's circuit
+breaker opens and requests to it fail straight away until a trial request
+succeeds again.
+
+Pool sizes are set with HTTP_POOL_MAX_CONNECTIONS, HTTP_POOL_MAX_KEEPALIVE and
+HTTP_KEEPALIVE_EXPIRY, timeouts with HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT and
+HTTP_TIMEOUT, and the circuit breaker with HTTP_BREAKER_FAILURES and
+HTTP_BREAKER_COOLDOWN, or any of them per upstream by adding its name, e.g.
+HTTP_READ_TIMEOUT_BOPRC.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+try:
+    import h2  # noqa: F401, needed by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Set HTTP2=0 to always use HTTP/1.1.
+HTTP2_ENABLED = HTTP2_AVAILABLE and os.getenv("HTTP2", "1") != "0"
+# (connect, read, overall) timeout seconds per upstream. The overall deadline
+# covers a whole request, including waiting for a connection and reading a streamed body.
+TIMEOUTS = {
+    "niwa": (3, 10, 15),
+    "metocean": (3, 10, 15),
+    "boprc": (3, 10, 20),
+    "splash": (2, 5, 8),
+}
+# Consecutive failures that open an upstream's circuit breaker, and seconds it stays open.
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 30
+
+UPSTREAMS = ("niwa", "metocean", "boprc", "splash")
+COUNTERS = ("requests", "connections", "tls_handshakes", "http2_requests", "reused", "errors", "rejected")
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+def _setting(name, upstream, default):
+    """Read a pool setting, preferring the upstream's own override."""
+    return float(os.getenv(f"{name}_{upstream.upper()}", os.getenv(name, default)))
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    Closed, requests go through. After max_failures failures in a row it opens
+    and requests are rejected for cooldown seconds, then one trial request is
+    let through (half open): success closes it again, failure reopens it.
+    """
+
+    def __init__(self, max_failures, cooldown):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def allow(self):
+        """Return a token to pass to record() if a request may be sent now, None if not."""
+        state = self.state
+        if state == "closed":
+            return "closed"
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return "trial"
+        return None
+
+    def record(self, token, ok):
+        """Record the outcome of a request allow() let through.
+
+        Args:
+            token (str): What allow() returned for the request. Only the trial
+                request ends the trial, whatever else completes meanwhile.
+            ok (bool): Whether the upstream answered, None if the request was
+                cancelled or failed for reasons that aren't the upstream's
+        """
+        if token == "trial":
+            self._trial = False
+        if ok is None:
+            return
+        if ok:
+            self.failures, self._opened_at = 0, None
+            return
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= self.max_failures:
+            self._opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    """An httpx.AsyncClient for one upstream, with a deadline and a circuit breaker.
+
+    Has the same request(), get(), post() and stream() as httpx.AsyncClient.
+
+    A request taking longer than the deadline raises httpx.TimeoutException, and
+    one made while the circuit breaker is open raises CircuitOpenError. Transport
+    errors, timeouts and 5xx responses count as failures for the breaker.
+    """
+
+    def __init__(self, limits, timeouts, breaker, event_hooks, count):
+        connect, read, self.deadline = timeouts
+        self._http = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            limits=limits,
+            timeout=httpx.Timeout(connect=connect, read=read, write=read, pool=self.deadline),
+            # requests followed redirects, e.g. the SOS service moving to https.
+            follow_redirects=True,
+            event_hooks=event_hooks,
+        )
+        self.breaker = breaker
+        self._count = count
+
+    @asynccontextmanager
+    async def _client(self, url):
+        """Yield the client if the circuit breaker allows it, within the deadline."""
+        token = self.breaker.allow()
+        if token is None:
+            self._count("rejected")
+            raise CircuitOpenError(f"Circuit breaker open for {url}")
+        # Left None if the caller is cancelled or raises from its own code, e.g.
+        # decoding the body, which isn't the upstream's fault.
+        ok = None
+        try:
+            async with asyncio.timeout(self.deadline):
+                yield self._http
+            ok = True
+        except TimeoutError as e:
+            ok = False
+            raise httpx.TimeoutException(f"No response from {url} within {self.deadline:g}s") from e
+        except httpx.TransportError:
+            ok = False
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                ok = False
+            raise
+        finally:
+            if ok is False:
+                self._count("errors")
+            self.breaker.record(token, ok)
+
+    async def request(self, method, url, **kwargs):
+        async with self._client(url) as client:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code >= 500:
+                raise_server_error(response)
+            return response
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method, url, **kwargs):
+        async with self._client(url) as client:
+            async with client.stream(method, url, **kwargs) as response:
+                if response.status_code >= 500:
+                    raise_server_error(response)
+                yield response
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+def raise_server_error(response):
+    """Raise httpx.HTTPStatusError for a 5xx response, so it counts as a failure."""
+    raise httpx.HTTPStatusError(
+        f"{response.status_code} from {response.request.url}", request=response.request, response=response
+    )
+
+
+class ClientPool:
+    """One UpstreamClient per upstream, with connection reuse counters.
+
+    Clients are bound to the event loop they are first used on.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._counters = {}  # upstream -> {counter: int}
+
+    def _count(self, upstream, counter):
+        self._counters.setdefault(upstream, dict.fromkeys(COUNTERS, 0))[counter] += 1
+
+    def _tracer(self, upstream):
+        """Return a request hook counting the connections httpcore opens for the upstream.
+
+        A request is counted as reused when its headers are sent over a
+        connection it didn't open itself, so requests that fail before being
+        sent aren't.
+        """
+        events = {
+            "connection.connect_tcp.complete": "connections",
+            "connection.start_tls.complete": "tls_handshakes",
+            "http2.send_request_headers.started": "http2_requests",
+        }
+
+        async def on_request(request):
+            self._count(upstream, "requests")
+            opened = False
+
+            async def trace(event, info):
+                nonlocal opened
+                if event in events:
+                    self._count(upstream, events[event])
+                if event == "connection.connect_tcp.complete":
+                    opened = True
+                elif event.endswith(".send_request_headers.started") and not opened:
+                    self._count(upstream, "reused")
+
+            request.extensions["trace"] = trace
+
+        return on_request
+
+    def get(self, upstream):
+        """Return the shared client for an upstream, creating it on first use.
+
+        Args:
+            upstream (str): One of UPSTREAMS
+
+        Returns:
+            UpstreamClient: Client to make every request to that upstream with
+        """
+        client = self._clients.get(upstream)
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=int(_setting("HTTP_POOL_MAX_CONNECTIONS", upstream, "20")),
+                max_keepalive_connections=int(_setting("HTTP_POOL_MAX_KEEPALIVE", upstream, "10")),
+                keepalive_expiry=_setting("HTTP_KEEPALIVE_EXPIRY", upstream, "60"),
+            )
+            connect, read, deadline = TIMEOUTS[upstream]
+            client = self._clients[upstream] = UpstreamClient(
+                limits,
+                (
+                    _setting("HTTP_CONNECT_TIMEOUT", upstream, connect),
+                    _setting("HTTP_READ_TIMEOUT", upstream, read),
+                    _setting("HTTP_TIMEOUT", upstream, deadline),
+                ),
+                CircuitBreaker(
+                    int(_setting("HTTP_BREAKER_FAILURES", upstream, BREAKER_FAILURES)),
+                    _setting("HTTP_BREAKER_COOLDOWN", upstream, BREAKER_COOLDOWN),
+                ),
+                {"request": [self._tracer(upstream)]},
+                lambda counter: self._count(upstream, counter),
+            )
+        return client
+
+    def stats(self):
+        """Return request, connection and circuit breaker counters per upstream.
+
+        reused is the number of requests sent over an already open connection,
+        errors the number of failed requests and rejected the number failed
+        straight away by an open circuit breaker.
+
+        Returns:
+            dict: {"http2": bool, "upstreams": {upstream: {counter: int, "circuit": str}}}
+        """
+        upstreams = {upstream: dict(counts) for upstream, counts in self._counters.items()}
+        for upstream, client in self._clients.items():
+            upstreams.setdefault(upstream, dict.fromkeys(COUNTERS, 0))["circuit"] = client.breaker.state
+        return {"http2": HTTP2_ENABLED, "upstreams": upstreams}
+
+    async def close(self):
+        """Close every client and its open connections."""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+clients = ClientPool()
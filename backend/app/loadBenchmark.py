@@ -0,0 +1,194 @@
+"""Load benchmark of the backend's request path, sync against async.
+
+Starts a local stub of the splash scoring API that answers after a fixed
+latency, then serves the same proxied endpoint two ways and loads each with the
+same number of concurrent clients:
+- sync: a def handler making a blocking httpx.Client call, as the routes were
+  before, so each request holds one of Starlette's threadpool workers.
+- async: the real app (app.main), where the request waits on the upstream
+  without holding a thread.
+
+Each server runs in its own process. Throughput and latency percentiles are
+printed for both.
+
+Usage:
+    python -m app.loadBenchmark [--latency 0.5] [--concurrency 200] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import socket
+import statistics
+import time
+
+import httpx
+
+HOST = "127.0.0.1"
+UPSTREAM_PORT = 8971
+SYNC_PORT = 8972
+ASYNC_PORT = 8973
+
+CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.I)
+
+LEADERBOARD = [
+    {"username": "kahu", "score": 9.1},
+    {"username": "tama", "score": 8.7},
+    {"username": "aroha", "score": 8.2},
+]
+STATS = {"latest_username": "kahu", "latest_score": 9.1, "latest_rank": 1, "total_jumps": 42}
+
+
+def serve_upstream(port, latency):
+    """Serve a stub splash scoring API whose every response takes latency seconds.
+
+    A bare asyncio HTTP/1.1 server, so the stub costs as little CPU as possible.
+    """
+    bodies = {
+        b"/splash/leaderboard": json.dumps(LEADERBOARD).encode(),
+        b"/splash/stats": json.dumps(STATS).encode(),
+    }
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                path = request.split(b" ", 2)[1].split(b"?")[0]
+                await asyncio.sleep(latency)
+                body = bodies.get(path, b"{}")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                    % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, HOST, port, backlog=4096)
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def serve_sync(port, upstream_url):
+    """Serve /api/leaderboard with a blocking handler, as before the async backend."""
+    import uvicorn
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    client = httpx.Client(limits=httpx.Limits(max_connections=100, max_keepalive_connections=100))
+
+    @app.get("/api/leaderboard")
+    def leaderboard():
+        response = client.get(upstream_url + "/splash/leaderboard")
+        return JSONResponse(content=response.json())
+
+    uvicorn.run(app, host=HOST, port=port, log_level="warning")
+
+
+def serve_async(port, upstream_url):
+    """Serve the real app, pointed at the stub upstream."""
+    os.environ["VITE_API_URL"] = upstream_url
+    os.environ["CONDITIONS_POLLER"] = "0"
+    os.environ.setdefault("NIWA_API_KEY", "benchmark")
+    os.environ.setdefault("METSERVICE_API_KEY", "benchmark")
+    import uvicorn
+
+    from .main import app
+
+    uvicorn.run(app, host=HOST, port=port, log_level="warning")
+
+
+def wait_until_up(port, timeout=15):
+    """Wait for a server to accept connections."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"Port {port} didn't open")
+
+
+async def load(port, path, concurrency, total):
+    """Send total requests from concurrency keep-alive connections at once.
+
+    Speaks HTTP/1.1 over bare asyncio streams rather than through an HTTP client,
+    so the load generator costs as little CPU as possible.
+
+    Returns:
+        tuple: (requests per second, latencies in seconds, number of errors)
+    """
+    latencies, errors = [], 0
+    remaining = total
+    request = f"GET {path} HTTP/1.1\r\nHost: {HOST}:{port}\r\n\r\n".encode()
+
+    async def worker():
+        nonlocal remaining, errors
+        reader, writer = await asyncio.open_connection(HOST, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                await reader.readexactly(int(CONTENT_LENGTH.search(head)[1]))
+                if head.split(b" ", 2)[1] != b"200":
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(worker() for _ in range(concurrency)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors += sum(isinstance(result, Exception) for result in results)
+    return len(latencies) / elapsed, latencies, errors
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100)[p - 1] * 1000 if len(values) > 1 else float("nan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load benchmark, sync vs async request path")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds the stub upstream takes to answer")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight at once")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+    args = parser.parse_args()
+
+    upstream_url = f"http://{HOST}:{UPSTREAM_PORT}"
+    spawn = multiprocessing.get_context("spawn")
+    servers = [
+        spawn.Process(target=serve_upstream, args=(UPSTREAM_PORT, args.latency), daemon=True),
+        spawn.Process(target=serve_sync, args=(SYNC_PORT, upstream_url), daemon=True),
+        spawn.Process(target=serve_async, args=(ASYNC_PORT, upstream_url), daemon=True),
+    ]
+    for server in servers:
+        server.start()
+    try:
+        for port in (UPSTREAM_PORT, SYNC_PORT, ASYNC_PORT):
+            wait_until_up(port)
+
+        print(f"upstream latency {args.latency * 1000:.0f} ms, {args.concurrency} concurrent, {args.requests} requests")
+        print(f"{'path':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for label, port in (("sync", SYNC_PORT), ("async", ASYNC_PORT)):
+            asyncio.run(load(port, "/api/leaderboard", min(args.concurrency, 20), 100))  # warm up
+            rate, latencies, errors = asyncio.run(load(port, "/api/leaderboard", args.concurrency, args.requests))
+            print(
+                f"{label:<6} {rate:>8.0f} {percentile(latencies, 50):>8.1f} "
+                f"{percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} {errors:>7}"
+            )
+    finally:
+        for server in servers:
+            server.terminate()
@@ -1,18 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from dotenv import load_dotenv
 
-from . import uvApi
-from . import regionalCouncilApi as regional
+from . import dashboard
+from . import etags
 from . import manuSplashApi as splash
-from . import metServiceApi as met
+from . import splashEvents
 from . import warningLevel
+from .cache import upstream_cache
+from .conditions import LAT, LON, POLLER_ENABLED, poller
+from .httpClient import clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background conditions poller; stop it, the event relay and upstream connections on shutdown."""
+    if POLLER_ENABLED:
+        poller.start()
+    yield
+    await poller.stop()
+    await splashEvents.relay.stop()
+    await clients.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 latest_video_name = ''
-LAT="-37.68272674985233"
-LON="176.17082423934843"
 load_dotenv()
 
 
@@ -37,53 +53,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend see that a value is the last known good one.
+    expose_headers=["X-Stale"],
 )
 
 
 @app.get("/api")
-def root():
+async def root():
     return {"message": "Backend is running"}
 
 
 
+# Condition endpoints are tagged with the poller's validators, so a client
+# revalidating an unchanged reading gets 304 Not Modified, see etags.respond().
+
 # NIWA UV API endpoint
 @app.get("/api/uv")
-def get_uv():
+async def get_uv(request: Request):
     """Return the current-hour UV index for the provided Tauranga coordinates.\
     Returns:
         dict: {"lat": float, "long": float, "uv": float} UV index data
     """
-    uv_value = uvApi.get_current_uv(str(LAT), str(LON))
+    etag, max_age, stale = poller.validators(("uv",))
+    uv_value = await poller.get("uv")
     if uv_value is None:
         raise HTTPException(status_code=502, detail="Could not fetch UV value")
     # uvApi.get_uv_info_chart(lat, long, "clear", "chart.png")
     
-    return {"lat": LAT, "long": LON, "uv": uv_value}
+    return etags.respond(request, etag, max_age, {"lat": LAT, "long": LON, "uv": uv_value}, stale)
 
 
 #BOP Regional Council API endpoint
 @app.get("/api/tideHeight")
-def get_current_tide_height():
+async def get_current_tide_height(request: Request):
     """Return the current tide height in metres.
     
     Returns:
         dict: {"height": float} Tide height in metres
     """
-    height = regional.get_tide_height()
-    return {"height": height}
+    etag, max_age, stale = poller.validators(("tide",))
+    height = await poller.get("tide")
+    return etags.respond(request, etag, max_age, {"height": height}, stale)
 
 @app.get("/api/waterTemp")
-def get_current_tide_height():
+async def get_current_tide_height(request: Request):
     """Returns water temprature in degress celcius
 
     Returns:
         dict: {"temp": float} Water temprature in °C
     """
-    temp = regional.get_water_temprature()
-    return {"temp": temp}
+    etag, max_age, stale = poller.validators(("waterTemp",))
+    temp = await poller.get("waterTemp")
+    return etags.respond(request, etag, max_age, {"temp": temp}, stale)
 
 @app.get("/api/enterococci")
-def get_enterococci():
+async def get_enterococci(request: Request):
     """Return the current enterococci saftey level.
 
     Returns:
@@ -91,12 +115,13 @@ def get_enterococci():
                 "140" = Be alert
                 "280" = Public warning
     """
-    saftey_threshhold = regional.get_enterococci()
-    return {"safteyLevel": saftey_threshhold}
+    etag, max_age, stale = poller.validators(("enterococci",))
+    saftey_threshhold = await poller.get("enterococci")
+    return etags.respond(request, etag, max_age, {"safteyLevel": saftey_threshhold}, stale)
 
 
 @app.get("/api/warning-level")
-def get_warning_level():
+async def get_warning_level(request: Request):
     """Return the overall warning level based on water quality, tide height, 
     water temperature and other metrics.
     
@@ -106,47 +131,110 @@ def get_warning_level():
         3 = Bad - Swimming not advised
     
     Returns:
-        dict: {"level": int, "message": str, "tide_height": float, "water_temp": float}
+        dict: {"level": int, "message": str, "tide_height": float, "water_temp": float,
+               "unavailable": list} unavailable lists sources with no value (timed out, failed
+               or no recent observation)
     """
-    return warningLevel.calculate_warning_level()
+    etag, max_age, stale = poller.validators(warningLevel.WARNING_SOURCES)
+    return etags.respond(request, etag, max_age, await warningLevel.calculate_warning_level(), stale)
 
 
 # MetService API endpoints
 @app.get("/api/windSpeed")
-def get_current_wind_speed():
+async def get_current_wind_speed(request: Request):
     """Return the current wind speed at in knots.
     Returns:
         dict: {"speed": float} Wind speed in m/s
 
     """
-    speed = met.get_wind_10m(LAT, LON)
-    return {"speed": speed}
+    etag, max_age, stale = poller.validators(("wind",))
+    speed = await poller.get("wind")
+    return etags.respond(request, etag, max_age, {"speed": speed}, stale)
 
 
 # Manu Splash API endpoints
 @app.get("/api/leaderboard")
-def get_leaderboard():
+async def get_leaderboard(request: Request):
     """Returns current top 3 manu scores 
 
+    Tagged with the splash scoring API's ETag, which changes with every jump.
+
     Returns:
         JSONResponse: Leaderboard data, see manuSplashApi.get_leaderboard() for format
     """
-    return splash.get_leaderboard()
+    return await splash.get_leaderboard(request)
 
 @app.get("/api/latestJump")
-def get_latest_jump():
-    """Returns the latest jump score and username. 
+async def get_latest_jump(request: Request):
+    """Returns the latest jump score, username and leaderboard position.
 
     Returns:
-        dict: {"username": str, "score": float} Latest jump data
+        dict: {"username": str, "score": float, "rank": int or None} Latest jump data,
+            rank is None if the jump didn't make the leaderboard
     """
-    return splash.get_latest_jump()
+    return await splash.get_latest_jump(request)
 
 @app.get("/api/totalJumps")
-def get_total_jumps():
+async def get_total_jumps(request: Request):
     """Returns the total number of jumps recorded.
 
     Returns:
         int: Total jumps
     """
-    return splash.get_total_jumps()
\ No newline at end of file
+    return await splash.get_total_jumps(request)
+
+@app.get("/api/dashboard")
+async def get_dashboard(fields: str | None = None):
+    """Returns everything the dashboard shows in one response, each source fetched once.
+
+    Args:
+        fields (str): Comma separated fields to include, default all of dashboard.FIELDS:
+            uv, tideHeight, waterTemp, enterococci, windSpeed, warningLevel,
+            leaderboard, latestJump, totalJumps
+
+    Returns:
+        dict: {field: same value as the field's own endpoint, ...,
+               "unavailable": list of fields with no value,
+               "stale": list of fields served from their last known good value}
+    """
+    try:
+        selected = dashboard.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await dashboard.build_dashboard(selected)
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Returns the upstream cache hit/miss counters.
+
+    Returns:
+        dict: {"sources": {source: {"hits", "stale_hits", "misses", "coalesced", "refreshes", "errors"}},
+               "entries": {key: age in seconds}}
+    """
+    return upstream_cache.stats()
+
+@app.get("/api/http/stats")
+async def get_http_stats():
+    """Returns request, connection and circuit breaker counters for each upstream API.
+
+    Returns:
+        dict: {"http2": bool, "upstreams": {upstream: {"requests", "connections", "tls_handshakes",
+               "http2_requests", "reused", "errors", "rejected", "circuit"}}}
+    """
+    return clients.stats()
+
+
+@app.get("/api/events")
+async def get_events(request: Request):
+    """Relays the splash scoring API's Server-Sent Events stream.
+
+    Sends a "jump" event as soon as a jump is published, see /splash/events.
+
+    Returns:
+        StreamingResponse: text/event-stream of jump events
+    """
+    return StreamingResponse(
+        splashEvents.relay.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,37 +1,93 @@
 import os
+import time
+import httpx
 from dotenv import load_dotenv
-from fastapi.responses import JSONResponse
-import requests  # HTTP client library for making API calls
+from fastapi import HTTPException
+
+from . import etags
+from .httpClient import clients
 
 load_dotenv()
 VITE_API_URL = os.getenv("VITE_API_URL")
-
-def get_leaderboard():
-    """Ping splash scoring API to get the leaderboard data."""
-    response = requests.get(VITE_API_URL + "/splash/leaderboard")
-    data = response.json()
-    return JSONResponse(content=data)
-
-def __get_stats():
+LEADERBOARD_PATH = "/splash/leaderboard"
+STATS_PATH = "/splash/stats"
+
+# path -> (data, etag, fresh_until) of the splash scoring API's last good response
+_responses = {}
+
+async def fetch(path):
+    """GET a splash scoring API path, reusing the last response while its max-age allows.
+
+    After that the request is conditional on the last response's ETag, so an
+    unchanged leaderboard or stats comes back as an empty 304. If the API can't
+    be reached, times out or fails, the last good response is returned instead,
+    flagged as stale.
+
+    Returns:
+        tuple: (data, etag, max_age, stale) etag is None if the API didn't send one
+
+    Raises:
+        httpx.HTTPError: If the API failed and there is no earlier response to fall back on
+    """
+    now = time.monotonic()
+    cached = _responses.get(path)
+    if cached is not None and now < cached[2]:
+        return cached[0], cached[1], int(cached[2] - now), False
+    headers = {"If-None-Match": cached[1]} if cached is not None and cached[1] else {}
+    try:
+        response = await clients.get("splash").get(VITE_API_URL + path, headers=headers)
+    except httpx.HTTPError:
+        if cached is None:
+            raise
+        return cached[0], cached[1], 0, True
+    if response.status_code == 304 and cached is not None:
+        data, etag = cached[0], cached[1]
+    else:
+        data, etag = response.json(), response.headers.get("etag")
+    max_age = etags.max_age(response.headers.get("cache-control"))
+    if response.status_code in (200, 304):
+        _responses[path] = (data, etag, now + max_age)
+    return data, etag, max_age, False
+
+async def _respond(request, path, pick=lambda data: data):
+    """Respond with pick(data) for a splash scoring API path, see etags.respond()."""
+    try:
+        data, etag, max_age, stale = await fetch(path)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Could not reach the splash scoring API")
+    return etags.respond(request, etag, max_age, pick(data), stale)
+
+async def get_leaderboard_data():
+    """Ping splash scoring API to get the leaderboard entries."""
+    return (await fetch(LEADERBOARD_PATH))[0]
+
+async def get_leaderboard(request):
+    """Ping splash scoring API to get the leaderboard data, 304 if the client already has it."""
+    return await _respond(request, LEADERBOARD_PATH)
+
+async def get_stats():
     """Ping splash scoring API to get the stats data."""
-    response = requests.get(VITE_API_URL + "/splash/stats")
-    data = response.json()
-    return data 
-
-def get_latest_jump():
-    """Ping splash scoring API to get the latest jump score and username"""
-    data = __get_stats()
-    latest_jump = {
-        "username": data["latest_username"],
-        "score": data["latest_score"]
+    return (await fetch(STATS_PATH))[0]
+
+def latest_jump(stats):
+    """Pick the latest jump score, username and leaderboard position out of the stats data."""
+    return {
+        "username": stats["latest_username"],
+        "score": stats["latest_score"],
+        "rank": stats.get("latest_rank")
     }
-    return latest_jump
 
-def get_total_jumps():
+def total_jumps(stats):
+    """Pick the total number of jumps recorded out of the stats data."""
+    return stats["total_jumps"]
+
+async def get_latest_jump(request):
+    """Ping splash scoring API to get the latest jump score, username and leaderboard position"""
+    return await _respond(request, STATS_PATH, latest_jump)
+
+async def get_total_jumps(request):
     """Ping splash scoring API to get the total number of jumps recorded."""
-    data = __get_stats()
-    total_jumps = data["total_jumps"]
-    return total_jumps
+    return await _respond(request, STATS_PATH, total_jumps)
 
 
 
@@ -44,7 +100,7 @@ def get_total_jumps():
 
 # LEADERBOARD_FILE = os.path.join(os.path.dirname(__file__), "leaderboard.json")
 
-# def get_leaderboard():
+# async def get_leaderboard():
 #     """Load and return the leaderboard data from the JSON file."""
 #     if not os.path.exists(LEADERBOARD_FILE):
 #         raise HTTPException(status_code=404, detail="Leaderboard file not found")
@@ -1,9 +1,11 @@
-import requests
 import os
 from dotenv import load_dotenv
 import json
 from datetime import datetime, timezone
 
+from .cache import cached
+from .httpClient import clients
+
 load_dotenv()
 METSERVICE_API_KEY = os.getenv("METSERVICE_API_KEY")
 LAT = os.getenv("VITE_LAT")
@@ -17,7 +19,7 @@ def __now_utc():
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
-def __request_wind_10m(lat: str, lon: str):
+async def __request_wind_10m(lat: str, lon: str):
     """
     Fetch 10 m wind speed from the MetOcean Point API.
     """
@@ -48,19 +50,20 @@ def __request_wind_10m(lat: str, lon: str):
         "joinModels": True
     }
 
-    response = requests.post(url, headers=headers, data=json.dumps(body))
+    response = await clients.get("metocean").post(url, headers=headers, content=json.dumps(body))
     response.raise_for_status()
 
     return response.json()
 
-def get_wind_10m(lat, lon):
+@cached("wind")
+async def get_wind_10m(lat, lon):
     """
     Fetch 10 m wind speed from the MetOcean Point API.
     Returns wind speed in knots.
     """
     # print(f"Lat: {lat}, Lon: {lon}")
     
-    data = __request_wind_10m(lat, lon)
+    data = await __request_wind_10m(lat, lon)
     speed_ms = data['variables']['wind.speed.at-10m']['data'][0]
     speed_knots = speed_ms * 1.94384
     
@@ -1,6 +1,11 @@
-import requests
 from datetime import datetime
 
+import httpx
+
+from . import sosParser
+from .cache import cached
+from .httpClient import clients
+
 
 BASE_URL = "http://sos.boprc.govt.nz/service?service=SOS&version=2.0.0&request=GetObservation&offering="
 TIDE_HEIGHT_PATH = "Tide%20Height.ChartDatum@EP569596&observedProperty=Tide%20Height"
@@ -9,49 +14,88 @@ ENTEROCOCCI_PATH = "Ent.Rec@EP095164&observedProperty=Enterococci"
 
 
 
-def __request_from_url(url):
-    """Call the given SOS endpoint and return the latest observation value."""
-    
-    response = requests.get(url)
-    data = response.json()
+# Time windows tried in turn for each offering, narrowest first, until one has an
+# observation. Tide and water temperature are logged every few minutes, enterococci
+# is a weekly lab sample, and two months was the original fixed window.
+OBSERVATION_WINDOWS = {
+    TIDE_HEIGHT_PATH: ("PT1H", "P1D", "P2M"),
+    WATER_TEMP_PATH: ("PT6H", "P2D", "P2M"),
+    ENTEROCOCCI_PATH: ("P14D", "P2M"),
+}
 
-    # Extract the final value from the observation series.
-    values_array = data['observations'][0]['result']['values']
-    latest_value = values_array[-1][-1]
-    return latest_value
 
+async def __request_from_url(url, keep=1):
+    """Call the given SOS endpoint and return its last observations as [time, value] pairs, oldest first.
 
-def __generate_url(url):
+    Raises:
+        httpx.HTTPStatusError: If the service answered with anything but 200, rather than
+            reading an error page as an empty series
+    """
+    
+    # Stream the body and keep only the trailing observations instead of parsing the whole series.
+    parser = sosParser.TailParser(keep)
+    async with clients.get("boprc").stream("GET", url) as response:
+        if response.status_code != 200:
+            raise httpx.HTTPStatusError(
+                f"SOS service returned {response.status_code}", request=response.request, response=response
+            )
+        async for chunk in response.aiter_bytes(sosParser.CHUNK_SIZE):
+            if parser.feed(chunk):
+                break
+    return parser.values()
+
+
+def __generate_url(url, window="P2M"):
     now = datetime.utcnow()  # current UTC time (API expects UTC)
-    today_date = now.strftime("%Y-%m-%d")  # formatted yyyy-mm-dd
+    end_time = now.strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    # Limit results to the last 2 months up to the current day.
+    # Limit results to the given duration up to now.
     url = (
         BASE_URL
         + url
-        + f"&responseFormat=application/json&temporalFilter=om:phenomenonTime,P2m/{today_date}T"
+        + f"&responseFormat=application/json&temporalFilter=om:phenomenonTime,{window}/{end_time}"
         
     )
     return url
-    
 
 
-def get_tide_height():
+async def __recent_observations(path, count=1):
+    """Return up to count of the latest [time, value] pairs for an offering, widening the time window only while it comes back empty."""
+    for window in OBSERVATION_WINDOWS[path]:
+        values = await __request_from_url(__generate_url(path, window), count)
+        if values:
+            return values
+    return []
+
+
+async def __latest_observation(path):
+    """Return the latest value for an offering, or None if there are no observations."""
+    values = await __recent_observations(path)
+    if not values:
+        return None
+    latest_value = values[-1][-1]
+    return latest_value
+
+
+@cached("tide")
+async def get_tide_height():
     """Get the latest tide height from the regional council SOS service."""
-    url = __generate_url(TIDE_HEIGHT_PATH)
-    return __request_from_url(url)+3.5  # Completly arbitray number to make the front end look good. I always had the assumption that when teh wharf was built they took into consideration the lowest tide height and built the wharf at a height that would be safe to use even at the lowest tides. So I added 3.5m to the tide height to reflect this assumption. This is not based on any real data or calculations, just an educated guess to make the front end look better. 
+    height = await __latest_observation(TIDE_HEIGHT_PATH)
+    if height is None:
+        return None
+    return height+3.5  # Completly arbitray number to make the front end look good. I always had the assumption that when teh wharf was built they took into consideration the lowest tide height and built the wharf at a height that would be safe to use even at the lowest tides. So I added 3.5m to the tide height to reflect this assumption. This is not based on any real data or calculations, just an educated guess to make the front end look better. 
 
 
-def get_water_temprature():
+@cached("waterTemp")
+async def get_water_temprature():
     """Get the latest water temperature from the regional council SOS service."""
-    url = __generate_url(WATER_TEMP_PATH)
-    return __request_from_url(url)
+    return await __latest_observation(WATER_TEMP_PATH)
 
 
-def get_enterococci():
+@cached("enterococci")
+async def get_enterococci():
     """Get the latest Enterococci lab result."""
-    url = __generate_url(ENTEROCOCCI_PATH)
-    enterococci_value = __request_from_url(url) # Entercoli level
+    enterococci_value = await __latest_observation(ENTEROCOCCI_PATH) # Entercoli level
     
 
     return enterococci_value
@@ -60,9 +104,9 @@ def get_enterococci():
 def __debug_urls():
     """Print and return the fully qualified URLs used by the data fetchers."""
     url_map = {
-        "get_tide_height": __generate_url(TIDE_HEIGHT_PATH),
-        "get_water_temprature": __generate_url(WATER_TEMP_PATH),
-        "get_enterococci": __generate_url(ENTEROCOCCI_PATH)
+        "get_tide_height": __generate_url(TIDE_HEIGHT_PATH, OBSERVATION_WINDOWS[TIDE_HEIGHT_PATH][0]),
+        "get_water_temprature": __generate_url(WATER_TEMP_PATH, OBSERVATION_WINDOWS[WATER_TEMP_PATH][0]),
+        "get_enterococci": __generate_url(ENTEROCOCCI_PATH, OBSERVATION_WINDOWS[ENTEROCOCCI_PATH][0])
     }
     
     return url_map
@@ -0,0 +1,131 @@
+"""Streaming parser for regional council SOS observation payloads.
+
+An SOS GetObservation JSON response holds every observation in the requested
+window as [time, value] pairs under observations[0].result.values, but only the
+latest (or last few, for a trend) are ever used. Rather than building the whole
+document with json.loads, this reads the body a chunk at a time, decodes the
+text only as far as needed to find the pairs, holds on to the text of the last
+N, and stops reading once the values array ends. Only those N pairs are ever
+decoded, and memory use no longer grows with the size of the window.
+
+TailParser is fed one chunk at a time, so it works the same on a streamed
+response body and on a payload recorded to a file (see last_values()).
+"""
+
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+# Start of the first observation's result values array.
+VALUES_START = re.compile(r'"result"\s*:\s*\{.*?"values"\s*:\s*\[', re.S)
+# Between two [time, value] pairs, and the end of the last pair and the array.
+PAIR_BOUNDARY = re.compile(r"\]\s*,\s*\[")
+VALUES_END = re.compile(r"\]\s*\]")
+EMPTY_VALUES = re.compile(r"\s*\]")
+# Characters rescanned from the previous chunk, in case a match straddles two chunks.
+OVERLAP = 64
+
+
+class TailParser:
+    """Incremental parser holding the last observations of an SOS payload.
+
+    feed() it the body a chunk at a time until it returns True, then call
+    values(). Pairs are assumed flat ([time, value] with no nested arrays), as
+    the SOS service returns them.
+    """
+
+    def __init__(self, keep=1):
+        """
+        Args:
+            keep (int): Number of trailing observations to keep
+        """
+        self.keep = keep
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_values = False
+        self._scanned = 0
+        self._values = None
+
+    def feed(self, chunk):
+        """Add the next chunk of the body.
+
+        Args:
+            chunk (bytes): Next part of the JSON body
+
+        Returns:
+            bool: True once the values array has ended and the rest of the body isn't needed
+        """
+        if self._values is not None:
+            return True
+        self._buffer += self._text.decode(chunk)
+        return self._scan()
+
+    def _scan(self):
+        if not self._in_values:
+            # Find the values array; everything before it is small metadata.
+            match = VALUES_START.search(self._buffer)
+            if not match:
+                return False
+            self._buffer = self._buffer[match.end():]
+            self._in_values = True
+        if EMPTY_VALUES.match(self._buffer):
+            self._values = []
+            return True
+        # Read to the end of the array, only ever holding the text of the last few pairs.
+        end = VALUES_END.search(self._buffer, max(0, self._scanned - OVERLAP))
+        if end:
+            self._values = json.loads("[" + self._buffer[:end.start() + 1] + "]")[-self.keep:]
+            self._buffer = ""
+            return True
+        if len(self._buffer) > 2 * CHUNK_SIZE:
+            starts = [m.end() - 1 for m in PAIR_BOUNDARY.finditer(self._buffer, len(self._buffer) - CHUNK_SIZE)]
+            if len(starts) >= self.keep:
+                self._buffer = self._buffer[starts[-self.keep]:]
+        self._scanned = len(self._buffer)
+        return False
+
+    def values(self):
+        """Return the last observations, once the whole body (or enough of it) has been fed.
+
+        Returns:
+            list: Up to keep [time, value] pairs, oldest first; empty if there are no observations
+
+        Raises:
+            json.JSONDecodeError: If the values array is cut off or malformed
+        """
+        if self._values is None:
+            self._buffer += self._text.decode(b"", final=True)
+            if not self._scan():
+                if not self._in_values:
+                    return []
+                raise json.JSONDecodeError("Unterminated values array", self._buffer, len(self._buffer))
+        return self._values
+
+
+def last_values(chunks, keep=1):
+    """Return the last observations of an SOS payload.
+
+    Args:
+        chunks (iterable): The JSON body as byte chunks
+        keep (int): Number of trailing observations to keep
+
+    Returns:
+        list: Up to keep [time, value] pairs, oldest first; empty if there are no observations
+
+    Raises:
+        json.JSONDecodeError: If the values array is cut off or malformed
+    """
+    parser = TailParser(keep)
+    for chunk in chunks:
+        if chunk and parser.feed(chunk):
+            break
+    return parser.values()
+
+
+def read_file(path, chunk_size=CHUNK_SIZE):
+    """Yield a recorded payload file in chunks, for parsing fixtures offline."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
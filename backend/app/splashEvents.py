@@ -0,0 +1,91 @@
+"""Relay of the splash scoring API's event stream for SafeToManu.
+
+Browsers connect to /api/events instead of the splash scoring API directly. The
+backend holds a single connection to /splash/events, started by the first
+browser, and forwards every event to all connected browsers, reconnecting to the
+splash scoring API if it drops.
+"""
+
+import asyncio
+import os
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+VITE_API_URL = os.getenv("VITE_API_URL")
+
+# Seconds to wait before reconnecting to the splash scoring API.
+RECONNECT_DELAY = 2
+# Seconds between keep-alive comments to browsers.
+KEEPALIVE_INTERVAL = 15
+# Events buffered per browser before the oldest are dropped.
+MAX_PENDING_EVENTS = 20
+
+
+class EventRelay:
+    """Forwards Server-Sent Events from one upstream stream to many browsers."""
+
+    def __init__(self, url):
+        self.url = url
+        self._subscribers = set()
+        self._task = None
+
+    async def _relay(self):
+        """Read events from the splash scoring API and fan them out, forever."""
+        async with httpx.AsyncClient(timeout=httpx.Timeout(10, read=None)) as client:
+            while True:
+                try:
+                    async with client.stream("GET", self.url) as response:
+                        response.raise_for_status()
+                        message = []
+                        async for line in response.aiter_lines():
+                            if line:
+                                message.append(line)
+                                continue
+                            # A blank line ends a message; comments and retry hints stay upstream.
+                            if any(l.startswith(("event:", "data:")) for l in message):
+                                self._fan_out("\n".join(message) + "\n\n")
+                            message = []
+                except (httpx.HTTPError, httpx.StreamError):
+                    pass
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def stop(self):
+        """Cancel the relay task, closing the upstream connection."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _fan_out(self, message):
+        for q in list(self._subscribers):
+            if q.full():
+                q.get_nowait()
+            q.put_nowait(message)
+
+    async def stream(self, is_disconnected):
+        """Yield events for one browser until it disconnects.
+
+        Args:
+            is_disconnected: Coroutine function, True once the browser has gone
+
+        Yields:
+            str: Server-Sent Events messages
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._relay())
+        q = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+        self._subscribers.add(q)
+        try:
+            yield f"retry: {RECONNECT_DELAY * 1000}\n\n"
+            while not await is_disconnected():
+                try:
+                    yield await asyncio.wait_for(q.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self._subscribers.discard(q)
+
+
+relay = EventRelay(f"{VITE_API_URL}/splash/events")
@@ -1,8 +1,10 @@
-import requests
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
+from .cache import cached
+from .httpClient import clients
+
 # load api key from .env file
 load_dotenv()
 NIWA_API_KEY = os.getenv("NIWA_API_KEY")
@@ -13,7 +15,7 @@ if NIWA_API_KEY is None:
 
 
 
-def __get_uv_info(lat, long):
+async def __get_uv_info(lat, long):
     """Call the NIWA UV API for a latitude/longitude pair."""
     
     url = "https://api.niwa.co.nz/uv/data"
@@ -21,11 +23,11 @@ def __get_uv_info(lat, long):
 
     params = {"lat": lat, "long": long}
     
-    response = requests.get(url, headers=headers, params=params)
+    response = await clients.get("niwa").get(url, headers=headers, params=params)
     return response
 
 
-def __get_uv_info_chart(lat, long, skyType, save_path):
+async def __get_uv_info_chart(lat, long, skyType, save_path):
     """Call the NIWA UV chart API for a latitude/longitude pair to get the uv chart."""
     
     url = "https://api.niwa.co.nz/uv/chart.png"
@@ -33,7 +35,7 @@ def __get_uv_info_chart(lat, long, skyType, save_path):
 
     params = {"lat": lat, "long": long, "sky": skyType}
     
-    response = requests.get(url, headers=headers, params=params)
+    response = await clients.get("niwa").get(url, headers=headers, params=params)
     
     with open(save_path, 'wb') as f:
             f.write(response.content)
@@ -57,8 +59,9 @@ def __current_hour_uv(response, utc_offset_hours=13):
 
     return None
 
-def get_current_uv(lat, long):
+@cached("uv")
+async def get_current_uv(lat, long):
     """Convenience helper: fetch and return the current-hour UV for a location."""
-    response = __get_uv_info(lat, long)
+    response = await __get_uv_info(lat, long)
     return __current_hour_uv(response)
 
@@ -4,35 +4,54 @@ This module determines the overall swimming safety warning level
 based on multiple environmental factors.
 """
 
-from . import regionalCouncilApi as regional
+from .conditions import poller
 
+# Condition sources the warning level is worked out from.
+WARNING_SOURCES = ("enterococci", "tide", "waterTemp")
 
-def calculate_warning_level():
+
+async def calculate_warning_level():
     """Return the overall warning level based on water quality, tide height, 
     water temperature, and other metrics.
+
+    See warning_level() for the levels and the returned dict.
+    """
+    # Latest metrics from the background poller, fetched in parallel if not polled yet
+    metrics = await poller.get_many(WARNING_SOURCES)
+    return warning_level(metrics)
+
+
+def warning_level(metrics):
+    """Work out the warning level from already fetched metrics.
     
     Warning Levels:
         1 = Good - Safe to swim
         2 = Moderate - Swim with discretion
         3 = Bad - Swimming not advised
+
+    Without a water quality reading the level is never better than moderate,
+    so missing data isn't shown as safe.
     
+    Args:
+        metrics (dict): {"enterococci", "tide", "waterTemp"} values, None if unavailable
+
     Returns:
         dict: {
             "level": int,
             "message": str,
             "tide_height": float,
-            "water_temp": float
+            "water_temp": float,
+            "unavailable": list  # sources with no value: timed out, failed or no recent observation
         }
     """
-    # Fetch all metrics
-    water_quality = regional.get_enterococci()
-    tide_height = regional.get_tide_height()
-    water_temp = regional.get_water_temprature()
+    water_quality = metrics["enterococci"]
+    tide_height = metrics["tide"]
+    water_temp = metrics["waterTemp"]
     
     # Calculate warning level based on water quality thresholds
     if water_quality is None:
-        level = 1
-        message = "Waves clean • Sun shining • Conditions green"
+        level = 2
+        message = "Water quality data unavailable • Check signage before swimming"
     elif water_quality <= 140:
         level = 1
         message = "Waves clean • Sun shining • Conditions green"
@@ -67,5 +86,6 @@ def calculate_warning_level():
         "level": level,
         "message": message,
         "tide_height": tide_height,
-        "water_temp": water_temp
+        "water_temp": water_temp,
+        "unavailable": [name for name in WARNING_SOURCES if metrics.get(name) is None]
     }
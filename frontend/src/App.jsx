@@ -4,6 +4,7 @@ import './index.css'
 import DevDashboard from './devDashboard.jsx';
 import HomePage from './HomePage.jsx';
 import Manu from './Manu.jsx';
+import { DashboardProvider } from './context/DashboardContext.jsx';
 import { DevOverrideProvider } from './context/DevOverrideContext.jsx';
 import { WarningLevelProvider } from './context/WarningLevelContext.jsx';
 
@@ -12,16 +13,18 @@ function App() {
 
   return (
     <DevOverrideProvider>
-      <WarningLevelProvider>
-        <Router>
-          <Routes>
-            <Route path="/dev" element={<DevDashboard />} />
-            <Route path="/" element={<HomePage />} />
-            <Route path="/manu" element={<Manu />} />
+      <DashboardProvider>
+        <WarningLevelProvider>
+          <Router>
+            <Routes>
+              <Route path="/dev" element={<DevDashboard />} />
+              <Route path="/" element={<HomePage />} />
+              <Route path="/manu" element={<Manu />} />
 
-          </Routes>
-        </Router>
-      </WarningLevelProvider>
+            </Routes>
+          </Router>
+        </WarningLevelProvider>
+      </DashboardProvider>
     </DevOverrideProvider>
   )
 }
@@ -19,12 +19,34 @@ function CountdownTimer() {
   const [latestUsername, setLatestUsername] = useState(null);
   const [leaderboardPosition, setLeaderboardPosition] = useState(null);
   const keepLoopingRef = useRef(keepLooping);
+  const phaseRef = useRef(phase);
+  const latestJumpRef = useRef(null);
 
   // Keep ref in sync with state
   useEffect(() => {
     keepLoopingRef.current = keepLooping;
   }, [keepLooping]);
 
+  useEffect(() => {
+    phaseRef.current = phase;
+  }, [phase]);
+
+  // Jump results pushed by the backend the moment a jump is scored
+  useEffect(() => {
+    const SERVER_ADDRESS = import.meta.env.VITE_API_URL;
+    const source = new EventSource(new URL('/api/events', SERVER_ADDRESS));
+
+    source.addEventListener('jump', (event) => {
+      const currentPhase = phaseRef.current;
+      if (currentPhase !== 'jump' && currentPhase !== 'filling') return;
+      latestJumpRef.current = JSON.parse(event.data);
+      // Score is in, finish the current fill and show it
+      setKeepLooping(false);
+    });
+
+    return () => source.close();
+  }, []);
+
   useEffect(() => {
     if (phase !== 'countdown' || countdown <= 0) return;
 
@@ -86,36 +108,32 @@ function CountdownTimer() {
     if (phase !== 'result') return;
 
     const SERVER_ADDRESS = import.meta.env.VITE_API_URL;
-    
-    // Fetch latest jump score from the API
-    fetch(new URL('/api/latestJump', SERVER_ADDRESS))
-      .then((res) => res.json())
-      .then((data) => {
-        if (data && typeof data.score === 'number') {
-          setLatestScore(data.score);
-          setLatestUsername(data.username || 'Anonymous');
-          
-          // Fetch leaderboard to determine position
-          return fetch(new URL('/api/leaderboard', SERVER_ADDRESS))
-            .then((res) => res.json())
-            .then((leaderboard) => {
-              if (Array.isArray(leaderboard)) {
-                const sorted = leaderboard
-                  .filter((item) => typeof item.score === 'number')
-                  .sort((a, b) => b.score - a.score);
-                
-                // Find position based on latest score
-                const position = sorted.findIndex((item) => item.score <= data.score);
-                setLeaderboardPosition(position > 0 ? position : sorted.length + 1);
-              }
-            });
-        }
-      })
-      .catch((err) => {
-        console.error('Failed to fetch score:', err);
-        setLatestScore(Math.floor(Math.random() * 50) + 10); // Fallback random score
-        setLeaderboardPosition(Math.floor(Math.random() * 10) + 1);
-      });
+
+    const showJump = (data) => {
+      setLatestScore(data.score);
+      setLatestUsername(data.username || 'Anonymous');
+      // Position is worked out when the jump is added to the leaderboard.
+      setLeaderboardPosition(typeof data.rank === 'number' ? data.rank : 'unranked');
+    };
+
+    if (latestJumpRef.current) {
+      // Already pushed over /api/events
+      showJump(latestJumpRef.current);
+    } else {
+      // Fetch latest jump score from the API
+      fetch(new URL('/api/latestJump', SERVER_ADDRESS))
+        .then((res) => res.json())
+        .then((data) => {
+          if (data && typeof data.score === 'number') {
+            showJump(data);
+          }
+        })
+        .catch((err) => {
+          console.error('Failed to fetch score:', err);
+          setLatestScore(Math.floor(Math.random() * 50) + 10); // Fallback random score
+          setLeaderboardPosition(Math.floor(Math.random() * 10) + 1);
+        });
+    }
 
     // Transition to leaderboard after 5 seconds
     const timer = setTimeout(() => {
@@ -126,6 +144,7 @@ function CountdownTimer() {
   }, [phase]);
 
   const startCountdown = useCallback(() => {
+    latestJumpRef.current = null;
     setCountdown(5);
     setPhase('countdown');
     setIsRunning(true);
@@ -211,7 +230,7 @@ function CountdownTimer() {
                 className="text-4xl font-bold"
                 style={{ color: leaderboardPosition === 1 ? COLORS.yellow : leaderboardPosition <= 3 ? COLORS.mint : 'white' }}
               >
-                #{leaderboardPosition !== null ? leaderboardPosition : '...'}
+                {leaderboardPosition === 'unranked' ? 'Unranked' : `#${leaderboardPosition !== null ? leaderboardPosition : '...'}`}
               </span>
               {leaderboardPosition === 1 && <span className="text-3xl">🏆</span>}
               {leaderboardPosition === 2 && <span className="text-3xl">🥈</span>}
@@ -0,0 +1,49 @@
+import { createContext, useContext, useState, useEffect } from 'react';
+
+const DashboardContext = createContext();
+
+const SERVER_ADDRESS = import.meta.env.VITE_API_URL;
+
+// Fetches everything the dashboard widgets show in one request to /api/dashboard,
+// instead of each widget calling its own endpoint.
+export function DashboardProvider({ children }) {
+  const [dashboard, setDashboard] = useState(null);
+  const [status, setStatus] = useState("loading"); // loading | loaded | error
+
+  useEffect(() => {
+    fetchDashboard();
+  }, []);
+
+  const fetchDashboard = async () => {
+    try {
+      const url = new URL("/api/dashboard", SERVER_ADDRESS);
+      const response = await fetch(url, { method: "GET" });
+
+      if (!response.ok) {
+        throw new Error("Network response was not ok");
+      }
+
+      setDashboard(await response.json());
+      setStatus("loaded");
+    } catch (err) {
+      console.error("Error fetching dashboard:", err);
+      setStatus("error");
+    }
+  };
+
+  return (
+    <DashboardContext.Provider value={{ dashboard, status, fetchDashboard }}>
+      {children}
+    </DashboardContext.Provider>
+  );
+}
+
+export function useDashboard() {
+  const context = useContext(DashboardContext);
+  if (!context) {
+    throw new Error("useDashboard must be used within a DashboardProvider");
+  }
+  return context;
+}
+
+export default DashboardContext;
@@ -1,22 +1,19 @@
 import { createContext, useContext, useState, useEffect } from 'react';
+import { useDashboard } from './DashboardContext.jsx';
 import { useDevOverride } from './DevOverrideContext.jsx';
 
 const WarningLevelContext = createContext();
 
-const SERVER_ADDRESS = import.meta.env.VITE_API_URL;
-
 export function WarningLevelProvider({ children }) {
   const [warningData, setWarningData] = useState({ level: 1, message: null });
   const { overrides } = useDevOverride();
+  // The warning level comes with the rest of the dashboard data
+  const { dashboard, status, fetchDashboard } = useDashboard();
   
   // Check if water quality override is enabled for dev testing
   const waterQualityOverride = overrides.waterQuality;
 
-  useEffect(() => {
-    fetchWarningLevel();
-  }, []);
-
-  // Re-fetch or recalculate when override changes
+  // Recalculate when the override or the dashboard data changes
   useEffect(() => {
     if (waterQualityOverride.enabled) {
       // Calculate warning level locally based on override value
@@ -33,28 +30,15 @@ export function WarningLevelProvider({ children }) {
       }
       
       setWarningData({ level, message });
-    } else {
-      fetchWarningLevel();
+    } else if (dashboard?.warningLevel) {
+      setWarningData({ level: dashboard.warningLevel.level, message: dashboard.warningLevel.message });
+    } else if (status === "error") {
+      // Missing data must not read as safe
+      setWarningData({ level: 2, message: "Water quality data unavailable • Check signage before swimming" });
     }
-  }, [waterQualityOverride.enabled, waterQualityOverride.value]);
+  }, [waterQualityOverride.enabled, waterQualityOverride.value, dashboard, status]);
 
-  const fetchWarningLevel = async () => {
-    try {
-      const url = new URL("/api/warning-level", SERVER_ADDRESS);
-      const response = await fetch(url, { method: "GET" });
-      
-      if (!response.ok) {
-        throw new Error("Network response was not ok");
-      }
-      
-      const data = await response.json();
-      setWarningData({ level: data.level, message: data.message });
-    } catch (err) {
-      console.error("Error fetching warning level:", err);
-      // Default to safe if API fails
-      setWarningData({ level: 1, message: null });
-    }
-  };
+  const fetchWarningLevel = fetchDashboard;
 
   return (
     <WarningLevelContext.Provider value={{ warningData, fetchWarningLevel }}>
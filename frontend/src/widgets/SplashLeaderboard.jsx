@@ -1,4 +1,5 @@
 import { useState, useEffect } from "react"
+import { useDashboard } from "../context/DashboardContext"
 // !!!!!!!!!! Depreciated Hasn't been updated to match changes in backend, use at your own risk. !!!!!!!!! //
 
 const SERVER_ADDRESS = import.meta.env.VITE_API_URL
@@ -19,10 +20,13 @@ function Leaderboard() {
   const [error, setError] = useState("")        // error message to display
   const [data, setData] = useState([])          // formatted top 3 entries for display
 
-  // fetch leaderboard on component mount
+  // leaderboard from the dashboard data, refetched on its own by the refresh button
+  const { dashboard } = useDashboard()
   useEffect(() => {
-        fetchLeaderboard(); 
-    }, []);
+        if (dashboard?.leaderboard) {
+            showLeaderboard(dashboard.leaderboard);
+        }
+    }, [dashboard]);
 
     // format top 3 entries when data is loaded
     useEffect(() => {
@@ -41,6 +45,17 @@ function Leaderboard() {
 
 
 
+  // filter valid entries and sort by score descending
+  const showLeaderboard = (data) => {
+    const normalized = Array.isArray(data)
+      ? data
+          .filter((item) => typeof item.score === "number")
+          .sort((a, b) => b.score - a.score)
+      : []
+    setEntries(normalized)
+    setStatus("loaded")
+  }
+
   // fetch leaderboard data from backend API
   const fetchLeaderboard = async () => {
     setStatus("loading")
@@ -51,15 +66,7 @@ function Leaderboard() {
       if (!response.ok) {
         throw new Error(`Request failed with status ${response.status}`)
       }
-      const data = await response.json()
-      // filter valid entries and sort by score descending
-      const normalized = Array.isArray(data)
-        ? data
-            .filter((item) => typeof item.score === "number")
-            .sort((a, b) => b.score - a.score)
-        : []
-      setEntries(normalized)
-      setStatus("loaded")
+      showLeaderboard(await response.json())
     } catch (err) {
       setStatus("error")
       setError(err?.message || "Unable to load leaderboard")
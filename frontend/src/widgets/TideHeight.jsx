@@ -1,9 +1,7 @@
-import { useState, useEffect } from "react"
+import { useDashboard } from "../context/DashboardContext"
 import { useDevOverride } from "../context/DevOverrideContext"
 import DevSlider from "../components/DevSlider"
 
-const SERVER_ADDRESS = import.meta.env.VITE_API_URL
-
 // theme colors for the widget
 const COLORS = {
   surface: "#050915",   // main background
@@ -17,41 +15,14 @@ const SAFE_THRESHOLD = 4.2  // minimum safe tide height in meters
 const MAX_TIDE = 6.5        // max tide for gauge scaling
 
 function TideHeight() {
-  const [apiTideHeight, setApiTideHeight] = useState(null)  // tide height from API
+  const { dashboard } = useDashboard()
+  const apiTideHeight = dashboard?.tideHeight?.height ?? null  // tide height from the dashboard data
   
   // dev override context - allows manual override of tide value for testing
   const { overrides, toggleOverride, setValue } = useDevOverride()
   const override = overrides.tideHeight
   const tideHeight = override.enabled ? override.value : apiTideHeight  // use override if enabled
 
-  // fetch tide height on component mount
-  useEffect(() => {
-    requestTideHeight()
-  }, [])
-
-  // fetch current tide height from backend API
-  const requestTideHeight = async () => {
-    const url = new URL("/api/tideHeight", SERVER_ADDRESS)
-
-    const response = await fetch(url, {
-      method: "GET",
-    })
-
-    if (!response.ok) {
-      throw new Error("Network response was not ok")
-    }
-    let data
-    try {
-      data = await response.json()
-    } catch (err) {
-      const text = await response.text()
-      console.error("Invalid JSON received from tide height endpoint", text)
-      throw err
-    }
-
-    setApiTideHeight(data.height ?? data)  // handle both {height: x} and raw number
-  }
-
   // derived values for gauge display
   const hasValue = tideHeight !== undefined && tideHeight !== null
   const numericHeight = hasValue ? Number(tideHeight) : null
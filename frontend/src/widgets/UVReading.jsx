@@ -1,10 +1,9 @@
 // Have used a bit ofd AI to help with this component, mainly for the SVG gauge generation and the logic around it.
 import { useEffect, useState } from "react"
+import { useDashboard } from "../context/DashboardContext"
 import { useDevOverride } from "../context/DevOverrideContext"
 import DevSlider from "../components/DevSlider"
 
-const SERVER_ADDRESS = import.meta.env.VITE_API_URL
-
 // SVG gauge dimensions
 const GAUGE_CENTER_X = 80
 const GAUGE_CENTER_Y = 80
@@ -22,10 +21,11 @@ const COLORS = {
 }
 
 function UVReading() {
-  const [apiUv, setApiUv] = useState(null)       // UV index from API
+  const { dashboard, status } = useDashboard()
+  const apiUv = dashboard?.uv?.uv ?? null        // UV index from the dashboard data
+  const loading = status === "loading"           // still waiting on the dashboard data
   const [pointerX, setPointerX] = useState(0)    // gauge needle X position
   const [pointerY, setPointerY] = useState(0)    // gauge needle Y position
-  const [loading, setLoading] = useState(true)   // loading state for API call
   const [gaugeSize, setGaugeSize] = useState(75) // gauge display size percentage
   
   // dev override context - allows manual override of UV value for testing
@@ -33,11 +33,6 @@ function UVReading() {
   const override = overrides.uv
   const uv = override.enabled ? override.value : apiUv  // use override if enabled
 
-  // fetch UV data on component mount
-  useEffect(() => {
-    requestUV()
-  }, [])
-
   // recalculate needle position when UV value changes
   useEffect(() => {
     calculatePosition()
@@ -58,33 +53,6 @@ function UVReading() {
     setPointerY(y)
   }
 
-  // fetch current UV index from backend API
-  const requestUV = async () => {
-    setLoading(true)
-    const url = new URL("/api/uv", SERVER_ADDRESS)
-    const response = await fetch(url, {
-      method: "GET",
-    })
-
-    if (!response.ok) {
-      throw new Error("Network response was not ok")
-    }
-    let data
-    try {
-      data = await response.json()
-    } catch (err) {
-      const text = await response.text()
-      console.error("Invalid JSON received from UV endpoint", text)
-      throw err
-    }
-
-    // handle both raw number and {uv: x} response formats
-    const uvValue = typeof data === "number" ? data : data?.uv
-    const parsedUv = uvValue == null ? null : Number(uvValue)
-    setApiUv(Number.isFinite(parsedUv) ? parsedUv : null)
-    setLoading(false)
-  }
-
   // determine status label, color, and message based on UV index value
   // returns object with label, color, and safety message
   const uvStatus = (() => {
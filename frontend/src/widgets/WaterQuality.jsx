@@ -1,8 +1,7 @@
-import { useState, useEffect } from "react"
+import { useDashboard } from "../context/DashboardContext"
 import { useDevOverride } from "../context/DevOverrideContext"
 import DevSlider from "../components/DevSlider"
 
-const SERVER_ADDRESS = import.meta.env.VITE_API_URL
 const COLORS = {
   surface: "#050915",
   border: "#0f1b2f",
@@ -13,16 +12,13 @@ const COLORS = {
 }
 
 function WaterQuality() {
-  const [apiWaterQuality, setApiWaterQuality] = useState(null)
+  const { dashboard } = useDashboard()
+  const apiWaterQuality = dashboard?.enterococci?.safteyLevel ?? null
   
   const { overrides, toggleOverride, setValue } = useDevOverride()
   const override = overrides.waterQuality
   const waterQuality = override.enabled ? override.value : apiWaterQuality
 
-  useEffect(() => {
-    requestWaterQuality()
-  }, [])
-
   const getWaterQualityStatus = (value) => {
     if (value === null || value === undefined) {
       return {
@@ -82,28 +78,6 @@ function WaterQuality() {
     }
   }
 
-  const requestWaterQuality = async () => {
-    const url = new URL("/api/enterococci", SERVER_ADDRESS)
-
-    const response = await fetch(url, {
-      method: "GET",
-    })
-
-    if (!response.ok) {
-      throw new Error("Network response was not ok")
-    }
-    let data
-    try {
-      data = await response.json()
-    } catch (err) {
-      const text = await response.text()
-      console.error("Invalid JSON received from Water Quality endpoint", text)
-      throw err
-    }
-
-    setApiWaterQuality(data.safteyLevel ?? data)
-  }
-
   const status = getWaterQualityStatus(waterQuality)
   const badgeColor =
     status.tone === "safe"
@@ -1,8 +1,7 @@
-import { useState, useEffect } from "react"
+import { useDashboard } from "../context/DashboardContext"
 import { useDevOverride } from "../context/DevOverrideContext"
 import DevSlider from "../components/DevSlider"
 
-const SERVER_ADDRESS = import.meta.env.VITE_API_URL
 const COLORS = {
   surface: "#060b17",
   border: "#0f1b2f",
@@ -12,38 +11,13 @@ const COLORS = {
 const TEMP_RANGE = { min: 0, max: 35 }
 
 function WaterTemp() {
-  const [apiWaterTemp, setApiWaterTemp] = useState(null)
+  const { dashboard } = useDashboard()
+  const apiWaterTemp = dashboard?.waterTemp?.temp ?? null
   
   const { overrides, toggleOverride, setValue } = useDevOverride()
   const override = overrides.waterTemp
   const waterTemp = override.enabled ? override.value : apiWaterTemp
 
-  useEffect(() => {
-    requestWaterTemp()
-  }, [])
-
-  const requestWaterTemp = async () => {
-    const url = new URL("/api/waterTemp", SERVER_ADDRESS)
-
-    const response = await fetch(url, {
-      method: "GET",
-    })
-
-    if (!response.ok) {
-      throw new Error("Network response was not ok")
-    }
-    let data
-    try {
-      data = await response.json()
-    } catch (err) {
-      const text = await response.text()
-      console.error("Invalid JSON received from water temperature endpoint", text)
-      throw err
-    }
-
-    setApiWaterTemp(data.temp ?? data)
-  }
-
   const hasValue = waterTemp !== undefined && waterTemp !== null
   const numericTemp = hasValue ? Number(waterTemp) : null
   const clampedTemp =
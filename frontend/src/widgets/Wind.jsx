@@ -1,8 +1,7 @@
-import { useState, useEffect } from "react"
+import { useDashboard } from "../context/DashboardContext"
 import { useDevOverride } from "../context/DevOverrideContext"
 import DevSlider from "../components/DevSlider"
 
-const SERVER_ADDRESS = import.meta.env.VITE_API_URL
 const COLORS = {
   surface: "#060b17",
   border: "#0f1b2f",
@@ -12,38 +11,13 @@ const COLORS = {
 const WIND_RANGE = { min: 0, max: 40 }
 
 function WindSpeed() {
-  const [apiWindSpeed, setApiWindSpeed] = useState(null)
+  const { dashboard } = useDashboard()
+  const apiWindSpeed = dashboard?.windSpeed?.speed ?? null
   
   const { overrides, toggleOverride, setValue } = useDevOverride()
   const override = overrides.windSpeed
   const windSpeed = override.enabled ? override.value : apiWindSpeed
 
-  useEffect(() => {
-    requestWindSpeed()
-  }, [])
-
-  const requestWindSpeed = async () => {
-    const url = new URL("/api/windSpeed", SERVER_ADDRESS)
-
-    const response = await fetch(url, {
-      method: "GET",
-    })
-
-    if (!response.ok) {
-      throw new Error("Network response was not ok")
-    }
-    let data
-    try {
-      data = await response.json()
-    } catch (err) {
-      const text = await response.text()
-      console.error("Invalid JSON received from Wind speed endpoint", text)
-      throw err
-    }
-
-    setApiWindSpeed(data.speed ?? data)
-  }
-
   const hasValue = windSpeed !== undefined && windSpeed !== null
   const numericWind = hasValue ? Number(windSpeed) : null
   const clampedWind =
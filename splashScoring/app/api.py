@@ -1,11 +1,23 @@
+import asyncio
 import json
 import logging
 import os
+import queue
 import subprocess
-from typing import List
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+# Sibling modules are imported the same way run.py imports them.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import events
+import history
+import jobs
+import store
 
 # Configure logging
 logging.basicConfig(
@@ -14,10 +26,95 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+APP_DIR = os.path.dirname(__file__)
+WORKER_SCRIPT = os.path.join(APP_DIR, "worker.py")
+# Set SPLASH_WORKER=0 to run without the warm scoring worker (run.py then falls back to manumeter.py).
+START_WORKER = os.getenv("SPLASH_WORKER", "1") != "0"
 
 LEADERBOARD_FILE = os.path.join(os.path.dirname(__file__), "leaderboard.json")
 STATS_FILE = os.path.join(os.path.dirname(__file__), "stats.json")
+# Seconds browsers and proxies may reuse a leaderboard or stats response before revalidating it.
+CACHE_MAX_AGE = int(os.getenv("SPLASH_CACHE_MAX_AGE", "2"))
+# Part of every ETag, so a restart (e.g. after hand-editing leaderboard.json) invalidates them.
+BOOT_ID = f"{int(time.time()):x}"
+
+
+def round_scores(lb):
+    """Convert full scores into whole numbers for display."""
+    for entry in lb:
+        entry["score"] = round(float(entry["score"]), 0)
+    return lb
+
+
+# In-memory copies of the files run.py writes, reloaded only when they change.
+leaderboard_cache = store.JsonFileCache(LEADERBOARD_FILE, transform=round_scores)
+stats_cache = store.JsonFileCache(STATS_FILE)
+# Every jump, for the daily and weekly leaderboards.
+jump_history = history.JumpHistory()
+# Jump results pushed to displays on /splash/events.
+event_broker = events.EventBroker()
+jump_watcher = events.JumpWatcher(event_broker, stats_cache, leaderboard_cache)
+
+
+def versioned(request, version, render):
+    """
+    Respond with render()'s JSON body tagged with an ETag for version, or with 304
+    Not Modified, without calling render(), if the client already has that version.
+
+    The version comes from the jump counter the event watcher keeps in memory, so
+    a 304 costs no file or database access. run.py writes leaderboard.json before
+    stats.json, so the counter never runs ahead of the leaderboard.
+
+    Args:
+        request (Request): The incoming request
+        version (str): Content version, None to send the body untagged
+        render (callable): Returns the response body as bytes
+    """
+    headers = {"Cache-Control": f"public, max-age={CACHE_MAX_AGE}"}
+    if version is not None:
+        etag = f'"{BOOT_ID}-{version}"'
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match", "")
+        client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in client_tags or "*" in client_tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=render(), media_type="application/json", headers=headers)
+
+
+def on_jump_published(job):
+    """Pick up the new leaderboard and stats straight away after a queued jump is scored."""
+    leaderboard_cache.invalidate()
+    stats_cache.invalidate()
+    jump_watcher.poke()
+
+
+# Queue of jumps waiting to be recorded and scored.
+job_queue = jobs.JobQueue(on_done=on_jump_published)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the SAM2 scoring worker, job queue and event watcher alongside the API, stop the worker on shutdown."""
+    worker_proc = None
+    if START_WORKER and not os.getenv("MANUMETER_WORKER_AUTHKEY"):
+        logger.warning("MANUMETER_WORKER_AUTHKEY is not set, not starting the scoring worker")
+    elif START_WORKER:
+        logger.info(f"Starting scoring worker: {WORKER_SCRIPT}")
+        worker_proc = subprocess.Popen([sys.executable, WORKER_SCRIPT], cwd=APP_DIR)
+    job_queue.start()
+    event_broker.attach(asyncio.get_running_loop())
+    jump_watcher.start()
+    yield
+    if worker_proc is not None:
+        logger.info("Stopping scoring worker")
+        worker_proc.terminate()
+        try:
+            worker_proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            worker_proc.kill()
+
+
+app = FastAPI(lifespan=lifespan)
 
 logger.info(f"Splash Scoring API initialized")
 logger.info(f"Leaderboard file: {os.path.abspath(LEADERBOARD_FILE)}")
@@ -31,60 +128,90 @@ def root():
 
 
 @app.get("/splash/leaderboard")
-def get_leaderboard() -> List[dict]:
-    """Load and return the leaderboard data from the JSON file."""
-    if not os.path.exists(LEADERBOARD_FILE):
-        raise HTTPException(status_code=404, detail="Leaderboard file not found")
+def get_leaderboard(request: Request, period: Optional[str] = None, limit: int = history.TOP_N) -> List[dict]:
+    """
+    Return the leaderboard, with scores rounded to whole numbers.
+
+    Without a period this is leaderboard.json, served from memory. With period
+    today, week or all the top jumps are read from the jump history instead.
+    Tagged with the jump count, and for a period with the history version too,
+    which a history import bumps. See versioned().
+    """
+    jumps = jump_watcher.jumps
+    if period is not None:
+        if period not in history.PERIODS:
+            raise HTTPException(
+                status_code=400, detail=f"period must be one of {', '.join(history.PERIODS)}"
+            )
+        limit = max(1, min(limit, 500))
+        # Today's and this week's leaderboards also change when the day does.
+        version = None if jumps is None else (
+            f"{jumps}-{jump_watcher.history_version}-{period}-{limit}-{history.day_of(time.time())}"
+        )
+        return versioned(
+            request, version, lambda: json.dumps(round_scores(jump_history.top(period, limit))).encode()
+        )
 
-    with open(LEADERBOARD_FILE, "r") as f:
-        lb = json.load(f)
+    def render():
+        body = leaderboard_cache.get_bytes()
+        if body is None:
+            raise HTTPException(status_code=404, detail="Leaderboard file not found")
+        return body
 
-    # Convert full score into a whole number
-    for entry in lb:
-        entry["score"] = round(float(entry["score"]), 0)
+    return versioned(request, None if jumps is None else str(jumps), render)
 
 
-    return JSONResponse(content=lb)
+@app.get("/splash/stats")
+def get_stats(request: Request) -> dict:
+    """Return the stats data from memory, tagged with the jump count, see versioned()."""
+    def render():
+        body = stats_cache.get_bytes()
+        if body is None:
+            raise HTTPException(status_code=404, detail="Stats file not found")
+        return body
 
+    jumps = jump_watcher.jumps
+    return versioned(request, None if jumps is None else str(jumps), render)
 
-@app.get("/splash/stats")
-def get_stats() -> dict:
-    """Load and return the stats data from the JSON file."""
-    if not os.path.exists(STATS_FILE):
-        raise HTTPException(status_code=404, detail="Stats file not found")
 
-    with open(STATS_FILE, "r") as f:
-        stats = json.load(f)
+@app.get("/splash/events")
+async def get_events(request: Request):
+    """
+    Server-Sent Events stream with a "jump" event for every published jump.
 
-    return JSONResponse(content=stats)
+    Each event carries the username, score, leaderboard rank, total jumps and the
+    entries added to and removed from the leaderboard.
+    """
+    return StreamingResponse(
+        event_broker.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/splash/run")
-def trigger_run(background_tasks: BackgroundTasks):
-    """Trigger run.py to record, analyze, and update the leaderboard."""
-    logger.info("Run endpoint triggered - starting splash recording pipeline")
-    
-    def run_pipeline():
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "run.py")
-            logger.info(f"Executing run.py at: {script_path}")
-            result = subprocess.run(
-                ["python", script_path],
-                cwd=os.path.dirname(__file__),
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                logger.info("run.py completed successfully")
-                logger.info(f"Output: {result.stdout}")
-            else:
-                logger.error(f"run.py failed with code {result.returncode}")
-                logger.error(f"Stderr: {result.stderr}")
-        except Exception as e:
-            logger.error(f"Error running pipeline: {e}")
-    
-    background_tasks.add_task(run_pipeline)
-    return {"message": "Splash recording pipeline started", "status": "running"}
+def trigger_run():
+    """Queue a jump: run.py records it when the camera is free, then scores it and updates the leaderboard."""
+    logger.info("Run endpoint triggered - queueing splash recording")
+    try:
+        job = job_queue.submit()
+    except queue.Full:
+        raise HTTPException(status_code=429, detail="Too many jumps queued, try again shortly")
+    return {
+        "message": "Splash recording queued",
+        "status": job["status"],
+        "job_id": job["id"],
+        "position": job["position"],
+    }
+
+
+@app.get("/splash/jobs/{job_id}")
+def get_job(job_id: str) -> dict:
+    """Return the status of a queued jump: queued, recording, scoring, done or failed."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+"""
+ManuMeter Benchmarks
+
+Times parts of the scoring pipeline against the implementation they replaced, and
+checks both give the same results.
+
+Benchmarks:
+- coarse: first pass colour score, full-frame mask measured from contours (the original
+  code) vs input-box-only mask measured from projections (frames/sec)
+- measure: measure_splash, contour based vs projection based (calls/sec)
+
+Usage:
+    python benchmark.py coarse --video ../testResources/67.mp4
+    python benchmark.py measure
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+import scoring
+
+DEFAULT_VIDEO = "../testResources/67.mp4"
+
+
+# measure_splash as it was before it stopped extracting contours.
+def legacy_measure_splash(mask):
+    mask_uint8 = (mask.astype(np.uint8)) * 255
+    area = int(mask.sum())
+    ys, xs = np.where(mask)
+    height = int(ys.max() - ys.min()) if len(ys) else 0
+    width = int(xs.max() - xs.min()) if len(xs) else 0
+    contours, _ = cv2.findContours(mask_uint8, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    if len(contours) > 1:
+        merged = np.vstack([c.reshape(-1, 2) for c in contours])
+        hull = cv2.convexHull(merged)
+        hull_area = int(cv2.contourArea(hull))
+    elif len(contours) == 1:
+        hull = cv2.convexHull(contours[0])
+        hull_area = int(cv2.contourArea(hull))
+    else:
+        hull_area = 0
+    return area, hull_area, height, width
+
+
+# Coarse score as it was before the first pass was restricted to the input box,
+# measured with the contour based measure_splash it used then.
+def legacy_coarse_score(frame, input_box, min_area=100):
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    splash_mask = cv2.inRange(hsv, (0, 20, 220), (180, 40, 255))
+    crop_mask = np.zeros_like(splash_mask)
+    x1, y1, x2, y2 = input_box
+    crop_mask[y1:y2, x1:x2] = splash_mask[y1:y2, x1:x2]
+    splash_mask = crop_mask // 255
+    area, hull_area, height_mask, width_mask = legacy_measure_splash(splash_mask)
+    return (
+        0
+        if area < min_area
+        else scoring.manu_score(area, hull_area, height_mask, width_mask)
+    )
+
+
+# Decodes the whole clip up front so only the scoring is timed.
+def load_frames(video_path):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise SystemExit(f"Error: cannot open video {video_path}")
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def time_fps(fn, frames, repeat):
+    """Return the best frames/sec of fn over the frames across repeat runs, and its results."""
+    best = 0.0
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(frame) for frame in frames]
+        elapsed = time.perf_counter() - start
+        best = max(best, len(frames) / elapsed)
+    return best, results
+
+
+def bench_coarse(args):
+    frames = load_frames(args.video)
+    box = scoring.INPUT_BOX
+    buffers = {}
+
+    before_fps, before = time_fps(lambda f: legacy_coarse_score(f, box), frames, args.repeat)
+    after_fps, after = time_fps(lambda f: scoring.coarse_score(f, box, 100, buffers), frames, args.repeat)
+
+    if not np.allclose(before, after):
+        raise SystemExit("Mismatch: input box coarse scores differ from full-frame scores")
+    print(f"Coarse pass on {args.video} ({len(frames)} frames)")
+    print(f"  before (full frame): {before_fps:8.1f} frames/sec")
+    print(f"  after  (input box):  {after_fps:8.1f} frames/sec")
+    print(f"  speedup: {after_fps / before_fps:.2f}x, scores identical")
+
+
+# Random splash-like masks: blobs of different sizes, noise, and edge cases.
+def sample_masks(count, shape, seed):
+    rng = np.random.default_rng(seed)
+    masks = [
+        np.zeros(shape, dtype=bool),
+        np.ones(shape, dtype=bool),
+    ]
+    single = np.zeros(shape, dtype=bool)
+    single[shape[0] // 2, shape[1] // 3] = True
+    masks.append(single)
+    line = np.zeros(shape, dtype=bool)
+    line[10, 5:200] = True
+    masks.append(line)
+    for _ in range(count):
+        mask = np.zeros(shape, dtype=np.uint8)
+        for _ in range(rng.integers(1, 6)):
+            center = (int(rng.integers(0, shape[1])), int(rng.integers(0, shape[0])))
+            axes = (int(rng.integers(1, 120)), int(rng.integers(1, 200)))
+            cv2.ellipse(mask, center, axes, float(rng.uniform(0, 180)), 0, 360, 1, -1)
+        mask[rng.random(shape) < rng.uniform(0, 0.02)] = 1
+        masks.append(mask.astype(bool) if rng.random() < 0.5 else mask)
+    return masks
+
+
+def time_calls(fn, items, repeat):
+    """Return the best calls/sec of fn over the items across repeat runs."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(items) / elapsed)
+    return best
+
+
+def bench_measure(args):
+    masks = sample_masks(args.masks, (720, 1280), args.seed)
+
+    for i, mask in enumerate(masks):
+        expected = legacy_measure_splash(mask)
+        actual = scoring.measure_splash(mask)
+        if expected != actual:
+            raise SystemExit(f"Mismatch on mask {i}: expected {expected}, got {actual}")
+
+    before = time_calls(legacy_measure_splash, masks, args.repeat)
+    after = time_calls(scoring.measure_splash, masks, args.repeat)
+    print(f"measure_splash on {len(masks)} masks of 1280x720")
+    print(f"  before (contours):    {before:8.1f} calls/sec")
+    print(f"  after  (projections): {after:8.1f} calls/sec")
+    print(f"  speedup: {after / before:.2f}x, outputs identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ManuMeter scoring stages")
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    coarse = sub.add_parser("coarse", help="First pass colour score frames/sec")
+    coarse.add_argument("--video", type=str, default=DEFAULT_VIDEO, help="Path to input video file")
+    coarse.add_argument("--repeat", type=int, default=3, help="Runs to take the best of")
+    coarse.set_defaults(func=bench_coarse)
+
+    measure = sub.add_parser("measure", help="measure_splash calls/sec and output check")
+    measure.add_argument("--masks", type=int, default=200, help="Random masks to generate")
+    measure.add_argument("--seed", type=int, default=0, help="Random seed for the masks")
+    measure.add_argument("--repeat", type=int, default=3, help="Runs to take the best of")
+    measure.set_defaults(func=bench_measure)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,216 @@
+"""
+Splash Event Stream
+
+Pushes jump results to displays over Server-Sent Events, so they hear about a
+new jump as soon as it is published instead of polling the stats.
+
+run.py publishes jumps from its own process by writing stats.json (after the
+leaderboard), so a watcher thread stats the file a few times a second and, when
+total_jumps goes up, publishes a "jump" event with the new score, username, rank
+and what changed on the leaderboard. The job queue's on_done hook pokes the
+watcher so queued jumps are announced without waiting for the next check.
+
+Each connected display gets its own bounded asyncio queue; a display that stops
+reading loses its oldest events rather than holding up the others.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stats.json checks.
+WATCH_INTERVAL = float(os.getenv("SPLASH_EVENTS_INTERVAL", "0.2"))
+# Milliseconds a browser waits before reconnecting a dropped stream.
+RETRY_MS = 2000
+# Seconds between keep-alive comments on an idle stream.
+KEEPALIVE_INTERVAL = 15
+# Events buffered per display before the oldest are dropped.
+MAX_PENDING_EVENTS = 20
+
+
+def format_event(event, data, event_id=None):
+    """
+    Format one Server-Sent Events message.
+
+    Args:
+        event (str): Event name
+        data: JSON-serialisable payload
+        event_id: Optional id, sent back by the browser as Last-Event-ID
+
+    Returns:
+        str: The message, including the blank line that ends it
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def leaderboard_delta(before, after):
+    """
+    Work out which entries joined and left the leaderboard.
+
+    Args:
+        before (list): Leaderboard entries before the jump
+        after (list): Leaderboard entries after the jump
+
+    Returns:
+        dict: {"added": [...], "removed": [...]} entries with their "rank"
+    """
+    def key(entry):
+        return (entry.get("username"), entry.get("score"))
+
+    old = Counter(key(e) for e in before)
+    new = Counter(key(e) for e in after)
+    added, removed = [], []
+    for rank, entry in enumerate(after, start=1):
+        if old[key(entry)] > 0:
+            old[key(entry)] -= 1
+        else:
+            added.append(dict(entry, rank=rank))
+    for rank, entry in enumerate(before, start=1):
+        if new[key(entry)] > 0:
+            new[key(entry)] -= 1
+        else:
+            removed.append(dict(entry, rank=rank))
+    return {"added": added, "removed": removed}
+
+
+class EventBroker:
+    """
+    Fans events out to every connected stream.
+
+    publish() can be called from any thread; the queues belong to the event loop
+    passed to attach().
+    """
+
+    def __init__(self, max_pending=MAX_PENDING_EVENTS):
+        self._max_pending = max_pending
+        self._loop = None
+        self._subscribers = set()
+
+    def attach(self, loop):
+        """Set the event loop the streams run on."""
+        self._loop = loop
+
+    def subscribe(self):
+        """Return a new queue that receives every published message. Call from the event loop."""
+        q = asyncio.Queue(maxsize=self._max_pending)
+        self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        self._subscribers.discard(q)
+
+    def publish(self, event, data, event_id=None):
+        """Send an event to every subscriber."""
+        if self._loop is None:
+            return
+        message = format_event(event, data, event_id)
+        self._loop.call_soon_threadsafe(self._fan_out, message)
+
+    def _fan_out(self, message):
+        for q in list(self._subscribers):
+            if q.full():
+                q.get_nowait()
+            q.put_nowait(message)
+
+    async def stream(self, is_disconnected):
+        """
+        Yield messages for one display until it disconnects.
+
+        Args:
+            is_disconnected: Coroutine function, True once the client has gone
+        """
+        q = self.subscribe()
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while not await is_disconnected():
+                try:
+                    yield await asyncio.wait_for(q.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(q)
+
+
+class JumpWatcher:
+    """
+    Publishes a "jump" event each time total_jumps in stats.json goes up.
+
+    Args:
+        broker (EventBroker): Where events are published
+        stats_cache (store.JsonFileCache): stats.json
+        leaderboard_cache (store.JsonFileCache): leaderboard.json
+        interval (float): Seconds between checks
+    """
+
+    def __init__(self, broker, stats_cache, leaderboard_cache, interval=WATCH_INTERVAL):
+        self._broker = broker
+        self._stats = stats_cache
+        self._leaderboard = leaderboard_cache
+        self._interval = interval
+        self._wake = threading.Event()
+        self._last_jumps = None
+        self._last_history_version = 0
+        self._last_leaderboard = []
+
+    def start(self):
+        """Take the current state as the baseline and start watching."""
+        self._check(publish=False)
+        if self._last_jumps is None:
+            # No stats.json yet, so the first jump creates it.
+            self._last_jumps = 0
+        threading.Thread(target=self._loop, name="splash-events", daemon=True).start()
+
+    @property
+    def jumps(self):
+        """total_jumps as of the last check, None until the watcher has started."""
+        return self._last_jumps
+
+    @property
+    def history_version(self):
+        """history_version as of the last check, bumped when jumps are imported into the history."""
+        return self._last_history_version
+
+    def poke(self):
+        """Check straight away, for jumps published by the job queue."""
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            try:
+                self._check()
+            except Exception as e:
+                logger.error(f"Event watcher failed: {e}")
+
+    def _check(self, publish=True):
+        stats = self._stats.get()
+        if stats is None:
+            return
+        leaderboard = self._leaderboard.get() or []
+        total = stats.get("total_jumps", 0)
+        if self._last_jumps is not None and total > self._last_jumps and publish:
+            self._broker.publish(
+                "jump",
+                {
+                    "username": stats.get("latest_username"),
+                    "score": stats.get("latest_score"),
+                    "rank": stats.get("latest_rank"),
+                    "total_jumps": total,
+                    "leaderboard": leaderboard_delta(self._last_leaderboard, leaderboard),
+                },
+                event_id=total,
+            )
+        self._last_jumps = total
+        self._last_history_version = stats.get("history_version", 0)
+        self._last_leaderboard = [dict(e) for e in leaderboard]
@@ -0,0 +1,274 @@
+"""
+Splash Jump History
+
+Every scored jump is kept in a SQLite database, not just the top 25 held in
+leaderboard.json, so leaderboards can be served for today, this week or all time.
+
+Each jump stores when it happened, the competitor, the best score, the first
+pass frame counts and the per-frame metrics from scores.csv. Jumps are indexed
+on (day, score) and on score, so a top-N query reads N index entries per day
+(N for all time) instead of sorting every jump.
+
+The database runs in WAL mode: the API reads while run.py writes without either
+waiting on the other.
+
+Usage:
+    python history.py import --leaderboard leaderboard.json --stats stats.json
+    python history.py top --period today
+"""
+
+import argparse
+import csv
+import datetime
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+import store
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_DB = os.getenv("SPLASH_HISTORY_DB", os.path.join(APP_DIR, "history.db"))
+# Leaderboard periods, see JumpHistory.top().
+PERIODS = ("today", "week", "all")
+# Default number of jumps in a leaderboard.
+TOP_N = 25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jumps (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    day TEXT NOT NULL,
+    username TEXT NOT NULL,
+    score REAL NOT NULL,
+    coarse_frames INTEGER,
+    frames_saved INTEGER,
+    video TEXT,
+    source TEXT NOT NULL DEFAULT 'live'
+);
+CREATE INDEX IF NOT EXISTS jumps_day_score ON jumps (day, score DESC);
+CREATE INDEX IF NOT EXISTS jumps_score ON jumps (score DESC);
+CREATE TABLE IF NOT EXISTS frames (
+    jump_id INTEGER NOT NULL REFERENCES jumps (id) ON DELETE CASCADE,
+    frame INTEGER NOT NULL,
+    score REAL NOT NULL,
+    area INTEGER NOT NULL,
+    hull_area INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    PRIMARY KEY (jump_id, frame)
+) WITHOUT ROWID;
+"""
+
+FRAME_COLUMNS = ("frame", "score", "area", "hull_area", "height", "width")
+
+
+# Local calendar day of a timestamp, the key jumps are grouped by.
+def day_of(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+# Reads the per-frame metrics manumeter.py wrote for the last jump.
+def read_frame_metrics(csv_path):
+    """
+    Read per-frame metrics from a scores.csv.
+
+    Args:
+        csv_path (str): Path of the scores.csv
+
+    Returns:
+        list: One dict per scored frame, empty if the file doesn't exist
+    """
+    if not os.path.exists(csv_path):
+        return []
+    with open(csv_path, newline="") as f:
+        rows = []
+        for row in csv.DictReader(f):
+            rows.append(
+                {
+                    "frame": int(row["frame"]),
+                    "score": float(row["score"]),
+                    "area": int(row["area"]),
+                    "hull_area": int(row["hull_area"]),
+                    "height": int(row["height"]),
+                    "width": int(row["width"]),
+                    "coarse_frames": int(row.get("coarse_frames") or 0),
+                    "frames_saved": int(row.get("frames_saved") or 0),
+                }
+            )
+        return rows
+
+
+class JumpHistory:
+    """
+    SQLite store of every jump.
+
+    Connections are opened lazily, one per thread, since a sqlite3 connection
+    can't be shared between the API's worker threads.
+    """
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def record(self, username, score, frames=(), video=None, created=None, source="live"):
+        """
+        Add a jump.
+
+        Args:
+            username (str): Name of the competitor
+            score (float): Best score of the jump
+            frames (list): Per-frame metrics, see read_frame_metrics()
+            video (str): Path of the recording
+            created (float): When the jump happened, now if None
+            source (str): "live" for scored jumps, "import" for jumps read from JSON
+
+        Returns:
+            int: Id of the new jump
+        """
+        if created is None:
+            created = time.time()
+        coarse_frames = frames[0]["coarse_frames"] if frames else None
+        frames_saved = frames[0]["frames_saved"] if frames else None
+        conn = self._conn()
+        with conn:
+            jump_id = conn.execute(
+                "INSERT INTO jumps (created, day, username, score, coarse_frames, frames_saved, video, source)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (created, day_of(created), username, float(score), coarse_frames, frames_saved, video, source),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO frames (jump_id, frame, score, area, hull_area, height, width)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(jump_id, *(f[c] for c in FRAME_COLUMNS)) for f in frames],
+            )
+        return jump_id
+
+    def top(self, period="all", limit=TOP_N, now=None):
+        """
+        Highest scoring jumps of a period, best first.
+
+        Args:
+            period (str): "today", "week" (since Monday) or "all"
+            limit (int): Number of jumps to return
+            now (float): Timestamp the period is relative to, now if None
+
+        Returns:
+            list: {"username": str, "score": float, "created": float} per jump
+
+        Raises:
+            ValueError: If period is not one of PERIODS
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}, expected one of {', '.join(PERIODS)}")
+        today = datetime.date.fromisoformat(day_of(time.time() if now is None else now))
+        if period == "all":
+            return self._top("", (), limit)
+        if period == "today":
+            return self._top(" WHERE day = ?", (today.isoformat(),), limit)
+        # A day range can't be read from the (day, score) index in score order, so
+        # each day is read in order and the days merged.
+        days = [today - datetime.timedelta(days=n) for n in range(today.weekday() + 1)]
+        per_day = [self._top(" WHERE day = ?", (day.isoformat(),), limit) for day in days]
+        merged = heapq.merge(*per_day, key=lambda jump: jump["score"], reverse=True)
+        return list(itertools.islice(merged, limit))
+
+    def _top(self, where, params, limit):
+        """Run a top-N query, best first."""
+        rows = self._conn().execute(
+            f"SELECT username, score, created FROM jumps{where} ORDER BY score DESC LIMIT ?",
+            (*params, int(limit)),
+        )
+        return [dict(row) for row in rows]
+
+    def frames(self, jump_id):
+        """Return the per-frame metrics of a jump, in frame order."""
+        rows = self._conn().execute(
+            "SELECT frame, score, area, hull_area, height, width FROM frames WHERE jump_id = ? ORDER BY frame",
+            (jump_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def count(self):
+        """Return the number of jumps recorded."""
+        return self._conn().execute("SELECT COUNT(*) FROM jumps").fetchone()[0]
+
+    def import_json(self, leaderboard_file, stats_file=None):
+        """
+        Import the jumps kept in the JSON files from before the history existed.
+
+        leaderboard.json entries have no timestamps, so they are dated by the file's
+        modification time. The latest jump in stats.json is added too if it didn't
+        make the leaderboard. Does nothing if an import has already been done.
+
+        The API tags period leaderboards with the jump count, which an import
+        doesn't change, so history_version in stats.json is bumped to let it
+        know the history changed.
+
+        Args:
+            leaderboard_file (str): Path of leaderboard.json
+            stats_file (str): Path of stats.json, optional
+
+        Returns:
+            int: Number of jumps imported
+        """
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM jumps WHERE source = 'import' LIMIT 1").fetchone():
+            return 0
+        entries = []
+        if os.path.exists(leaderboard_file):
+            created = os.path.getmtime(leaderboard_file)
+            for entry in store.read_json(leaderboard_file, []):
+                entries.append((entry["username"], float(entry["score"]), created))
+        if stats_file and os.path.exists(stats_file):
+            stats = store.read_json(stats_file, {})
+            latest = (stats.get("latest_username"), float(stats.get("latest_score", 0)))
+            if latest[0] not in (None, "None") and latest not in [e[:2] for e in entries]:
+                entries.append((*latest, os.path.getmtime(stats_file)))
+        for username, score, created in entries:
+            self.record(username, score, created=created, source="import")
+        if entries and stats_file:
+            store.update_json(stats_file, bump_history_version, {"total_jumps": 0})
+        return len(entries)
+
+
+# Marks a change to the history that didn't come with a new jump.
+def bump_history_version(stats):
+    stats["history_version"] = stats.get("history_version", 0) + 1
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Splash jump history")
+    parser.add_argument("--db", default=HISTORY_DB, help="History database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="Import jumps from the JSON files")
+    imp.add_argument("--leaderboard", default=os.path.join(APP_DIR, "leaderboard.json"))
+    imp.add_argument("--stats", default=os.path.join(APP_DIR, "stats.json"))
+
+    top = sub.add_parser("top", help="Print a leaderboard")
+    top.add_argument("--period", choices=PERIODS, default="all")
+    top.add_argument("--limit", type=int, default=TOP_N)
+
+    args = parser.parse_args()
+    history = JumpHistory(args.db)
+    if args.command == "import":
+        print(f"Imported {history.import_json(args.leaderboard, args.stats)} jumps into {args.db}")
+    else:
+        for i, jump in enumerate(history.top(args.period, args.limit), start=1):
+            print(f"{i}: {jump['username']} Score={jump['score']:.1f}")
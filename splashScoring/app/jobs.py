@@ -0,0 +1,256 @@
+"""
+Splash Jump Job Queue
+
+Queues jump requests from the splash scoring API and runs them through run.py in
+two stages:
+1. Capture: countdown, record and download (needs the camera)
+2. Score: analyse, update stats and the leaderboard (needs the scoring worker)
+
+There is a single camera slot and a single scoring slot, each served by its own
+thread, so two jumps never record at the same time or write the leaderboard at
+the same time, while the next jump can record as soon as the previous one has
+moved on to scoring.
+
+Every stage has a time limit, so a hung ssh, ffmpeg or scp fails that jump
+instead of holding the camera slot for good.
+"""
+
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_SCRIPT = os.path.join(APP_DIR, "run.py")
+
+# Jumps allowed to wait for the camera before new requests are turned away.
+MAX_QUEUED_JOBS = int(os.getenv("SPLASH_MAX_QUEUED_JOBS", "5"))
+# Finished jobs kept around for the status endpoint.
+MAX_FINISHED_JOBS = 100
+# Seconds each run.py stage may take before it is killed and the jump failed.
+# Capture covers the countdown, recording and download (or streamed scoring).
+STAGE_TIMEOUTS = {
+    "capture": float(os.getenv("SPLASH_CAPTURE_TIMEOUT", "180")),
+    "score": float(os.getenv("SPLASH_SCORE_TIMEOUT", "900")),
+}
+
+
+# Runs a command with a time limit.
+def run_process(cmd, timeout, **kwargs):
+    """
+    Run a command like subprocess.run(capture_output=True, text=True), with a time limit.
+
+    The command runs in its own process group and the whole group is killed on
+    timeout, so programs it started (ssh, ffmpeg, scp) don't keep running or
+    hold its output open.
+
+    Args:
+        cmd (list or str): Command to run, a string needs shell=True
+        timeout (float): Seconds to wait, None for no limit
+        **kwargs: Passed on to subprocess.Popen
+
+    Returns:
+        subprocess.CompletedProcess: Return code and output
+
+    Raises:
+        subprocess.TimeoutExpired: If the command took longer than timeout
+    """
+    with subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True, **kwargs
+    ) as proc:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+            proc.communicate()
+            raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+# Runs one run.py stage and reads its result line.
+def run_stage(args):
+    """
+    Run a run.py stage as a subprocess, within its STAGE_TIMEOUTS limit.
+
+    Args:
+        args (list): Stage name and arguments, see run.py
+
+    Returns:
+        dict: The stage result printed on run.py's RESULT line
+
+    Raises:
+        RuntimeError: If the stage failed, timed out or printed no result
+    """
+    logger.info(f"Running run.py {' '.join(args)}")
+    timeout = STAGE_TIMEOUTS.get(args[0])
+    try:
+        result = run_process([sys.executable, RUN_SCRIPT, *args], timeout, cwd=APP_DIR)
+    except subprocess.TimeoutExpired:
+        logger.error(f"run.py {args[0]} timed out after {timeout:g}s")
+        raise RuntimeError(f"{args[0]} stage timed out")
+    logger.info(f"Output: {result.stdout}")
+    if result.returncode != 0:
+        logger.error(f"run.py {args[0]} failed with code {result.returncode}")
+        logger.error(f"Stderr: {result.stderr}")
+        raise RuntimeError(f"{args[0]} stage failed")
+
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"{args[0]} stage returned no result")
+
+
+# Runs one pipeline stage on its own thread.
+def stage_loop(name, stage, in_queue, out_queue=None, on_failed=None):
+    """
+    Take items off in_queue, run the stage on them and pass the results on to out_queue.
+
+    Used by both the job queue and run.py's back to back pipeline, so a stage
+    fails the same way in each: an exception or a falsy result fails that item
+    only, and the loop moves on to the next one. A None on in_queue stops the
+    loop and is passed on so later stages stop too.
+
+    Args:
+        name (str): Stage name, passed to on_failed
+        stage (callable): Takes an item, returns what to pass on, falsy on failure
+        in_queue (queue.Queue): Items waiting for this stage
+        out_queue (queue.Queue): Items waiting for the next stage, None for the last stage
+        on_failed (callable): Called with (item, name, error message) when the stage fails
+    """
+    while True:
+        item = in_queue.get()
+        if item is None:
+            if out_queue is not None:
+                out_queue.put(None)
+            return
+
+        try:
+            result = stage(item)
+            error = None if result else f"{name} stage failed"
+        except Exception as e:
+            result, error = None, str(e)
+
+        if error is not None:
+            if on_failed is not None:
+                on_failed(item, name, error)
+            continue
+        if out_queue is not None:
+            out_queue.put(result)
+
+
+class JobQueue:
+    """
+    Bounded FIFO of jumps with one camera slot and one scoring slot.
+
+    Job status moves through queued -> recording -> scoring -> done, or to failed.
+    on_done is called with a snapshot of each job once it has been scored and published.
+    """
+
+    def __init__(self, max_queued=MAX_QUEUED_JOBS, stage_runner=run_stage, on_done=None):
+        self._run_stage = stage_runner
+        self._on_done = on_done
+        self._capture_queue = queue.Queue(maxsize=max_queued)
+        self._score_queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the camera and scoring threads."""
+        stages = (
+            ("capture", self._capture, self._capture_queue, self._score_queue),
+            ("score", self._score, self._score_queue, None),
+        )
+        for name, stage, in_queue, out_queue in stages:
+            thread = threading.Thread(
+                target=stage_loop,
+                args=(name, stage, in_queue, out_queue, self._failed),
+                name=f"splash-{name}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self):
+        """
+        Queue a new jump.
+
+        Returns:
+            dict: Snapshot of the new job, including its id and queue position
+
+        Raises:
+            queue.Full: If MAX_QUEUED_JOBS jumps are already waiting for the camera
+        """
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "status": "queued",
+            "created": time.time(),
+            "username": None,
+            "score": None,
+            "rank": None,
+            "error": None,
+        }
+        with self._lock:
+            self._capture_queue.put_nowait((job["id"], None))
+            self._jobs[job["id"]] = job
+            self._prune()
+            snapshot = dict(job, position=self._capture_queue.qsize())
+        logger.info(f"Queued jump {job['id']} at position {snapshot['position']}")
+        return snapshot
+
+    def get(self, job_id):
+        """Return a snapshot of a job, or None if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS."""
+        finished = [j for j, job in self._jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    # Stages for stage_loop(), items are (job_id, capture result).
+    def _capture(self, item):
+        job_id, _ = item
+        self._update(job_id, status="recording")
+        capture = self._run_stage(["capture", "--job-id", job_id])
+        self._update(job_id, status="scoring", username=capture["username"])
+        return job_id, capture
+
+    def _score(self, item):
+        job_id, capture = item
+        args = ["score", "--video", capture["video"], "--username", capture["username"]]
+        if capture.get("score") is not None:
+            args += ["--score", str(capture["score"])]
+        result = self._run_stage(args)
+        self._update(job_id, status="done", score=result["score"], rank=result.get("rank"))
+        logger.info(f"Jump {job_id} scored {result['score']:.1f}")
+        if self._on_done is not None:
+            # The jump is already published; a failing callback mustn't mark it failed.
+            try:
+                self._on_done(self.get(job_id))
+            except Exception:
+                logger.exception(f"on_done failed for jump {job_id}")
+        return item
+
+    def _failed(self, item, stage, error):
+        job_id, _ = item
+        logger.error(f"Jump {job_id} failed at {stage} stage: {error}")
+        self._update(job_id, status="failed", error=error)
@@ -16,18 +16,38 @@ Dependencies:
 - Pandas
 - SAM 2 (Segment Anything Model)
 
+Mask measurement, the score and the first pass come from scoring.py, which doesn't
+need torch or SAM 2.
+
+The model can be loaded once with load_predictor() and reused across calls to
+process_video(), which is how the long-lived scoring worker (worker.py) keeps
+SAM2 warm between jumps.
+
 Usage:
     python manumeter.py --video path/to/video.mp4
+    python manumeter.py --stream "<command writing raw bgr24 frames to stdout>"
 """
 
 import sys, os
 import numpy as np
 import argparse
+import subprocess
+import threading
 import cv2
 import torch
 import numpy as np
 import pandas as pd
 
+from scoring import (
+    EARLY_EXIT_MIN_AREA,
+    EARLY_EXIT_RATIO,
+    EARLY_EXIT_WINDOW,
+    INPUT_BOX,
+    coarse_pass,
+    manu_score,
+    measure_splash,
+)
+
 # For using sam imports.
 PROJECT_ROOT = "../"
 sys.path.append(os.path.join(PROJECT_ROOT, "samfiles"))
@@ -37,80 +57,107 @@ os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1"
 RESULTS_DIR = "../results"
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
+# Refine frames encoded per SAM forward pass. 11 covers the whole refine window in
+# one pass; lower it to save memory on CPU, 1 runs SAM frame by frame.
+SAM_BATCH_SIZE = int(os.getenv("SAM_BATCH_SIZE", "11"))
 
-# Measuring the splash based on the provided mask.
-def measure_splash(mask):
-    """
-    Calculate dimensions of a splash mask.
-    Returns:
-        tuple: (area, hull_area, height, width)
-            - area (int): Number of pixels in the mask
-            - hull_area (int): Area of the convex hull of the splash
-            - height (int): Height of the bounding box in pixels
-            - width (N/A for now): Width of the bounding box in pixels
-    """
-    mask_uint8 = (mask.astype(np.uint8)) * 255
-    # Number of pixels = area.
-    area = int(mask.sum())
-
-    # Coordinates of each pixel.
-    ys, xs = np.where(mask)
-    # Gets the height and width of the mask.
-    height = int(ys.max() - ys.min()) if len(ys) else 0
-    # Width is irrelevant now. Can be added later, but I don't believe it to be useful to scoring.
-    width = int(xs.max() - xs.min()) if len(xs) else 0
-    # Gets Mask contours.
-    contours, _ = cv2.findContours(mask_uint8, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
-
-    # Merge into one mask if theres more than 1 contour.
-    if len(contours) > 1:
-        merged = np.vstack([c.reshape(-1, 2) for c in contours])
-        hull = cv2.convexHull(merged)
-        hull_area = int(cv2.contourArea(hull))
-    # If there is 1 countour this is correct, get the hull area.
-    elif len(contours) == 1:
-        hull = cv2.convexHull(contours[0])
-        hull_area = int(cv2.contourArea(hull))
-    # Can't find hull, area is 0
-    else:
-        hull_area = 0
-    # Return values
-    return area, hull_area, height, width
-
-# Basic scoring system, based on my interpretation, subject to change.
-# Max areas are adjusted based on first run throughs to ensure a proper scoring. (View scores.csv)
-def manu_score(area, hull_area, height, AREA_MAX=10000, HULL_MAX=100000, HEIGHT_MAX=400):
-    """
-    Calculate a splash score based on measured metrics.
+# How the annotated overlay video and best frame images are produced:
+# "inline" before the score is returned, "deferred" on a background thread after it
+# is returned, "off" not at all (scoring only). Deferred renders write to the same
+# results files as the next jump, so it is opt-in.
+OVERLAY_MODES = ("inline", "deferred", "off")
+OVERLAY_MODE = os.getenv("MANUMETER_OVERLAY", "inline")
 
-    The score is a weighted combination of normalized height, area, and convex hull area.
-    Weights are: 60% height, 35% area, 5% convex hull area.
 
-    Args:
-        area (int): Pixel area of the splash
-        hull_area (int): Area of the convex hull
-        height (int): Height of the splash in pixels
-        AREA_MAX (int): Maximum expected area
-        HULL_MAX (int): Maximum expected hull area
-        HEIGHT_MAX (int): Maximum expected height
+# Using META's segment anything imports
+from sam2.build_sam import build_sam2
+from sam2.sam2_image_predictor import SAM2ImagePredictor
 
-    Returns:
-        float: Score between 0 and 100
+
+# Capture that reads raw frames from a command, used to score a recording as it streams in.
+class PipeCapture:
+    """
+    Minimal cv2.VideoCapture stand-in for raw BGR frames piped from a shell command.
+
+    The command must write bgr24 frames of the given size to stdout (for example
+    ffmpeg with -f rawvideo -pix_fmt bgr24 pipe:1). Frames are read as they arrive,
+    so analysis can start before the recording has finished. frame_count is the
+    expected length of the stream, if known.
     """
-    H = min(height / HEIGHT_MAX, 1.0) * 100
-    A = min(area / AREA_MAX, 1.0) * 100
-    C = min(hull_area / HULL_MAX, 1.0) * 100
-    # Abstract scoring, will be adjusted later.
-    score = 0.6 * H + 0.35 * A + 0.05 * C
-    # Score must not exceed 100, as it is the max end of the scale.
-    if score > 100:
-        score = 100
-    return score
 
+    def __init__(self, cmd, width, height, fps=30.0, frame_count=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = frame_count
+        self._frame = None
+        self._proc = subprocess.Popen(
+            cmd, shell=True, stdout=subprocess.PIPE, bufsize=width * height * 3
+        )
+
+    def isOpened(self):
+        return self._proc is not None
+
+    def grab(self):
+        """Read the next frame off the pipe. Returns False at the end of the stream."""
+        if self._proc is None:
+            return False
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        view = memoryview(frame).cast("B")
+        got = 0
+        while got < len(view):
+            n = self._proc.stdout.readinto(view[got:])
+            if not n:
+                self._frame = None
+                return False
+            got += n
+        self._frame = frame
+        return True
+
+    def retrieve(self):
+        return self._frame is not None, self._frame
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.frame_count
+        return 0
+
+    def release(self):
+        """
+        Stop reading frames.
+
+        If the command is still running (analysis stopped early) the rest of its
+        output is discarded in the background, so the recording it is making is
+        not cut short.
+        """
+        if self._proc is None:
+            return
+        proc = self._proc
+        self._proc = None
+        self._frame = None
+        if proc.poll() is None:
+            threading.Thread(target=_drain, args=(proc,), daemon=True).start()
+        else:
+            proc.stdout.close()
 
-# Using META's segment anything imports
-from sam2.build_sam import build_sam2
-from sam2.sam2_image_predictor import SAM2ImagePredictor
+
+def _drain(proc):
+    """Read and discard the remaining output of a PipeCapture command, then reap it."""
+    while proc.stdout.read(1 << 20):
+        pass
+    proc.stdout.close()
+    proc.wait()
 
 
 # SAM setup.
@@ -126,8 +173,186 @@ def load_sam(device):
     return model
 
 
+# Picks the fastest available torch device.
+def get_device():
+    """
+    Select the torch device to run SAM on.
+    Returns:
+        torch.device: cuda, then mps, then cpu depending on availability
+    """
+    if torch.cuda.is_available():
+        return torch.device("cuda")
+    if torch.backends.mps.is_available():
+        return torch.device("mps")
+    return torch.device("cpu")
+
+
+# Builds a predictor that can be kept warm and reused for every jump.
+def load_predictor(device=None):
+    """
+    Load SAM 2 and wrap it in an image predictor.
+
+    Loading the checkpoint is the slowest part of scoring, so callers that score
+    more than one video should load the predictor once and pass it to process_video.
+
+    Args:
+        device (torch.device): Device to load the model on (default: get_device())
+
+    Returns:
+        SAM2ImagePredictor: Predictor ready for set_image/predict calls
+    """
+    if device is None:
+        device = get_device()
+    print("Using device:", device)
+    return SAM2ImagePredictor(load_sam(device))
+
+
+# SAM refinement for more accurate segmentation, batched over the refine window.
+def predict_sam_masks(predictor, frames, input_box, batch_size=SAM_BATCH_SIZE):
+    """
+    Segment the splash in each frame with SAM, prompted by the input box.
+
+    Frames are encoded batch_size at a time with set_image_batch/predict_batch, so
+    the image encoder runs once per batch instead of once per frame. A batch size
+    of 1 uses set_image/predict frame by frame.
+
+    Args:
+        predictor (SAM2ImagePredictor): Loaded predictor
+        frames (list): BGR frames to segment
+        input_box (numpy.ndarray): Bounding box [x1, y1, x2, y2] used as the prompt for every frame
+        batch_size (int): Frames per forward pass, trades memory for throughput
+
+    Yields:
+        numpy.ndarray or None: SAM mask for each frame in order, None if SAM returned no mask
+    """
+    box = input_box[None, :]
+    if batch_size <= 1:
+        for frame in frames:
+            predictor.set_image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            masks, _, _ = predictor.predict(
+                point_coords=None,
+                point_labels=None,
+                box=box,
+                multimask_output=False,
+            )
+            yield masks[0] if len(masks) > 0 else None
+        return
+
+    for start in range(0, len(frames), batch_size):
+        batch = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames[start:start + batch_size]]
+        predictor.set_image_batch(batch)
+        masks_batch, _, _ = predictor.predict_batch(
+            box_batch=[box] * len(batch),
+            multimask_output=False,
+        )
+        for masks in masks_batch:
+            yield masks[0] if len(masks) > 0 else None
+
+
+# Draws the mask, box and text for one frame of the overlay video.
+def annotate_frame(frame, mask, input_box, idx, height_mask, splash_score, is_peak):
+    """
+    Composite the splash mask over a frame and label it.
+
+    Args:
+        frame (numpy.ndarray): BGR frame
+        mask (numpy.ndarray): Splash mask for the frame (0/1 or bool)
+        input_box (numpy.ndarray): Bounding box [x1, y1, x2, y2] drawn in green
+        idx (int): Frame index
+        height_mask (int): Measured splash height in pixels
+        splash_score (float): Score of the frame
+        is_peak (bool): Whether the frame was the best so far when it was scored
+
+    Returns:
+        numpy.ndarray: Annotated copy of the frame
+    """
+    x1, y1, x2, y2 = input_box
+    # Create video overlay with mask and annotations.
+    mask_colour = np.zeros_like(frame)
+    mask_colour[:, :, 2] = mask * 255
+    alpha = 0.5
+    overlayed = cv2.addWeighted(frame, 1.0, mask_colour, alpha, 0)
+    cv2.rectangle(overlayed, (x1, y1), (x2, y2), (0, 255, 0), 3)
+    # Puts peak frame text on peak frame.
+    if is_peak:
+        cv2.putText(
+            overlayed,
+            f"PEAK FRAME {idx}",
+            (50, 100),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.5,
+            (0, 255, 255),
+            3,
+        )
+    # Writes the current frame over the video.
+    cv2.putText(
+        overlayed,
+        f"Frame {idx}: Height {height_mask}px, Score {splash_score:.1f}",
+        (30, 50),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1,
+        (255, 255, 255),
+        2,
+        cv2.LINE_AA,
+    )
+    return overlayed
+
+
+# Only one overlay is written to results/ at a time.
+_render_lock = threading.Lock()
+
+
+# Writes the overlay video and best frame images for a scored clip.
+def render_overlay(refined, best, input_box, fps, size):
+    """
+    Encode splash_overlay.mp4 and save the best frame images.
+
+    Args:
+        refined (list): (idx, frame, mask, height_mask, splash_score, is_peak) per refined frame
+        best (tuple or None): (frame, mask) of the best frame
+        input_box (numpy.ndarray): Bounding box [x1, y1, x2, y2] for splash detection region
+        fps (float): Frame rate of the overlay video
+        size (tuple): (width, height) of the overlay video
+    """
+    x1, y1, x2, y2 = input_box
+    with _render_lock:
+        # Output video writer
+        output_video_path = os.path.join(RESULTS_DIR, "splash_overlay.mp4")
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        out_vid = cv2.VideoWriter(output_video_path, fourcc, fps, size)
+        for idx, frame, mask, height_mask, splash_score, is_peak in refined:
+            out_vid.write(
+                annotate_frame(frame, mask, input_box, idx, height_mask, splash_score, is_peak)
+            )
+        # Close video resources.
+        out_vid.release()
+
+        # Save best frame images.
+        if best is not None:
+            best_frame_img, best_frame_mask = best
+            mask_colour = np.zeros_like(best_frame_img)
+            mask_colour[:, :, 2] = best_frame_mask * 255
+            overlayed_best = cv2.addWeighted(best_frame_img, 1.0, mask_colour, 0.5, 0)
+            cv2.rectangle(overlayed_best, (x1, y1), (x2, y2), (0, 255, 0), 3)
+            cv2.imwrite(
+                os.path.join(RESULTS_DIR, "best_splash_frame_with_mask.png"), overlayed_best
+            )
+            cv2.imwrite(os.path.join(RESULTS_DIR, "best_splash_frame.png"), best_frame_img)
+    print("Overlay saved: splash_overlay.mp4, best_splash_frame.png, best_splash_frame_with_mask.png")
+
+
 # Processes the video and gets the relevant mask of each frame. The key to analysing the splashes.
-def process_video(video_path, input_box, min_area=100):
+def process_video(
+    video,
+    input_box=INPUT_BOX,
+    min_area=100,
+    predictor=None,
+    sam_batch_size=SAM_BATCH_SIZE,
+    overlay=OVERLAY_MODE,
+    early_exit_ratio=EARLY_EXIT_RATIO,
+    early_exit_window=EARLY_EXIT_WINDOW,
+    early_exit_min_area=EARLY_EXIT_MIN_AREA,
+):
     """
     Process a video to detect and score splashes using computer vision and SAM.
 
@@ -136,21 +361,37 @@ def process_video(video_path, input_box, min_area=100):
     2. Second pass: Detailed analysis around peak frame using SAM for refinement
 
     Args:
-        video_path (str): Path to the input video file
+        video (str or capture): Path to the input video file, or an opened capture
+            such as a PipeCapture streaming from the camera
         input_box (numpy.ndarray): Bounding box [x1, y1, x2, y2] for splash detection region
         min_area (int): Minimum pixel area to consider as a valid splash (default: 100)
+        predictor (SAM2ImagePredictor): Already loaded predictor to reuse, loaded on demand if None
+        sam_batch_size (int): Refine frames encoded per SAM forward pass (default: SAM_BATCH_SIZE)
+        overlay (str): "inline" renders the overlay before returning, "deferred" renders it
+            on a background thread after the score is returned, "off" skips it (default: OVERLAY_MODE)
+        early_exit_ratio (float): Stop the first pass once scores fall below this fraction of
+            the peak, 0 scans the whole clip (default: EARLY_EXIT_RATIO)
+        early_exit_window (int): Scored frames in a row that must fall below it (default: EARLY_EXIT_WINDOW)
+        early_exit_min_area (int): Peak area needed before stopping early (default: EARLY_EXIT_MIN_AREA)
+
+    Returns:
+        float or None: Best splash score, None if the video could not be analysed
 
     Outputs (saved to results):
-        - splash_overlay.mp4: Video with splash masks overlaid
-        - best_splash_frame.png: Best frame image
-        - best_splash_frame_with_mask.png: Best frame with mask overlay
-        - scores.csv: Frame-by-frame scoring data
+        - scores.csv: Frame-by-frame scoring data, with the frames read by the first pass
+          and the frames its early exit skipped
+        - splash_overlay.mp4: Video with splash masks overlaid (unless overlay is "off")
+        - best_splash_frame.png: Best frame image (unless overlay is "off")
+        - best_splash_frame_with_mask.png: Best frame with mask overlay (unless overlay is "off")
     """
+    if overlay not in OVERLAY_MODES:
+        raise ValueError(f"overlay must be one of {OVERLAY_MODES}, got {overlay!r}")
+
     # Get video.
-    cap = cv2.VideoCapture(video_path)
+    cap = cv2.VideoCapture(video) if isinstance(video, str) else video
     if not cap.isOpened():
         print("Error: cannot open video")
-        return
+        return None
 
     # Video info
     frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -158,81 +399,48 @@ def process_video(video_path, input_box, min_area=100):
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-    # Device setup
-    if torch.cuda.is_available():
-        device = torch.device("cuda")
-    elif torch.backends.mps.is_available():
-        device = torch.device("mps")
-    else:
-        device = torch.device("cpu")
-    print("Using device:", device)
-    model = load_sam(device)
-    predictor = SAM2ImagePredictor(model)
-
-    # Output video writer
-    output_video_path = os.path.join(RESULTS_DIR, "splash_overlay.mp4")
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    out_vid = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+    # Model setup, skipped when a warm predictor is passed in.
+    if predictor is None:
+        predictor = load_predictor()
 
     best_score = -1
-    best_frame_img = None
-    best_frame_mask = None
+    best = None
     best_frame_idx = -1
     scores_csv = []
+    # Per-frame data the overlay is drawn from.
+    refined = []
 
     print("Processing video (First Pass)")
 
     # First pass: Quick skipping with basic masks... find peak frame.
+    # Frames around the peak are kept from this single decode for the second pass.
     first_pass = 3
-    approx_peak_score = -1
-    approx_peak_idx = -1
-
-    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-    for idx in range(frame_count):
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if idx % first_pass != 0:
-            continue
-
-        # Simple masking using colours. Needs adjusting depending on environment.
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        #ADJUST 135 higher for brighter days, ADJUST 80 to filter out blues and greens
-        #splash_mask = cv2.inRange(hsv, (0, 0, 220), (180, 80, 255))
-        splash_mask = cv2.inRange(hsv, (0, 20, 220), (180, 40, 255)) 
-        crop_mask = np.zeros_like(splash_mask)
-        x1, y1, x2, y2 = input_box
-        crop_mask[y1:y2, x1:x2] = splash_mask[y1:y2, x1:x2]
-        splash_mask = crop_mask // 255
-        # Measure the splash dimensions.
-        area, hull_area, height_mask, width_mask = measure_splash(splash_mask)
-        # If area is too small, score is 0, otherwise process normally.
-        splash_score = (
-            0
-            if area < min_area
-            else manu_score(area, hull_area, height_mask, width_mask)
-        )
-        # Track approximate peak frame.
-        if splash_score > approx_peak_score:
-            approx_peak_score = splash_score
-            approx_peak_idx = idx
+    refine_range = 5
+    approx_peak_idx, approx_peak_score, refine_frames, frames_read = coarse_pass(
+        cap,
+        input_box,
+        min_area=min_area,
+        first_pass=first_pass,
+        refine_range=refine_range,
+        decay_ratio=early_exit_ratio,
+        decay_window=early_exit_window,
+        min_peak_area=early_exit_min_area,
+    )
+    cap.release()
+    # Frames the early exit didn't need to read (unknown clip length counts as none).
+    frames_saved = max(frame_count - frames_read, 0)
 
     print(
         f"First pass peak at frame {approx_peak_idx} (score : {approx_peak_score:.1f})"
     )
+    print(f"First pass read {frames_read} frames, {frames_saved} skipped by early exit")
 
     # Second pass: Detailed analysis around peak frame with SAM.
-    refine_range = 5
-    start_idx = max(0, approx_peak_idx - refine_range)
-    end_idx = min(frame_count, approx_peak_idx + refine_range + 1)
-
-    # Process frames in the refined range.
-    cap.set(cv2.CAP_PROP_POS_FRAMES, start_idx)
-    for idx in range(start_idx, end_idx):
-        ret, frame = cap.read()
-        if not ret:
-            break
-
+    x1, y1, x2, y2 = input_box
+    sam_masks = predict_sam_masks(
+        predictor, [frame for _, frame in refine_frames], input_box, sam_batch_size
+    )
+    for (idx, frame), sam_mask in zip(refine_frames, sam_masks):
         # Color-based masking (different thresholds for second pass).
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         #splash_mask = cv2.inRange(hsv, (0, 0, 135), (180, 80, 255))
@@ -252,18 +460,8 @@ def process_video(video_path, input_box, min_area=100):
                 cv2.drawContours(clean_mask, [c], -1, 255, -1)
         splash_mask = clean_mask // 255
 
-        # SAM refinement for more accurate segmentation
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        predictor.set_image(rgb_frame)
-        masks, scores, _ = predictor.predict(
-            point_coords=None,
-            point_labels=None,
-            box=input_box[None, :],
-            multimask_output=False,
-        )
         # Combining masks for refinement (both from the SAM mask, and the mask generated from detecting bright areas.)
-        if len(masks) > 0:
-            sam_mask = masks[0]
+        if sam_mask is not None:
             combined_mask = np.logical_and(splash_mask, sam_mask)
         # If SAM didn't work.
         else:
@@ -276,82 +474,67 @@ def process_video(video_path, input_box, min_area=100):
             if area < min_area
             else manu_score(area, hull_area, height_mask, width_mask)
         )
-        scores_csv.append([idx, splash_score, area, hull_area, height_mask, width_mask])
+        scores_csv.append(
+            [idx, splash_score, area, hull_area, height_mask, width_mask, frames_read, frames_saved]
+        )
 
         # Track best frame.
         if splash_score > best_score:
             best_score = splash_score
-            best_frame_img = frame.copy()
-            best_frame_mask = combined_mask.copy()
+            best = (frame, combined_mask)
             best_frame_idx = idx
 
-        # Create video overlay with mask and annotations.
-        mask_colour = np.zeros_like(frame)
-        mask_colour[:, :, 2] = combined_mask * 255
-        alpha = 0.5
-        overlayed = cv2.addWeighted(frame, 1.0, mask_colour, alpha, 0)
-        cv2.rectangle(overlayed, (x1, y1), (x2, y2), (0, 255, 0), 3)
-        # Puts peak frame text on peak frame.
-        if idx == best_frame_idx:
-            cv2.putText(
-                overlayed,
-                f"PEAK FRAME {idx}",
-                (50, 100),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1.5,
-                (0, 255, 255),
-                3,
+        if overlay != "off":
+            refined.append(
+                (idx, frame, combined_mask, height_mask, splash_score, idx == best_frame_idx)
             )
-        # Writes the current frame over the video.
-        cv2.putText(
-            overlayed,
-            f"Frame {idx}: Height {height_mask}px, Score {splash_score:.1f}",
-            (30, 50),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (255, 255, 255),
-            2,
-            cv2.LINE_AA,
-        )
-        out_vid.write(overlayed)
         print(f"Frame {idx}: score={splash_score:.1f}, height={height_mask} pixels, area={area} pixels")
 
-    # Close video resources.
-    cap.release()
-    out_vid.release()
-
-    # Save best frame images.
-    if best_frame_img is not None and best_frame_mask is not None:
-        mask_colour = np.zeros_like(best_frame_img)
-        mask_colour[:, :, 2] = best_frame_mask * 255
-        overlayed_best = cv2.addWeighted(best_frame_img, 1.0, mask_colour, alpha, 0)
-        cv2.rectangle(overlayed_best, (x1, y1), (x2, y2), (0, 255, 0), 3)
-        cv2.imwrite(
-            os.path.join(RESULTS_DIR, "best_splash_frame_with_mask.png"), overlayed_best
-        )
-        cv2.imwrite(os.path.join(RESULTS_DIR, "best_splash_frame.png"), best_frame_img)
-
     # Save scoring data to CSV.
     df = pd.DataFrame(
-        scores_csv, columns=["frame", "score", "area", "hull_area", "height", "width"]
+        scores_csv,
+        columns=[
+            "frame", "score", "area", "hull_area", "height", "width", "coarse_frames", "frames_saved"
+        ],
     )
     df.to_csv(os.path.join(RESULTS_DIR, "scores.csv"), index=False)
     # Console for debugging.
     print(f"\nBest frame = {best_frame_idx} score = {best_score:.2f}")
     print(f"\nSaved in results/:")
-    print("  splash_overlay.mp4")
-    print("  best_splash_frame.png")
-    print("  best_splash_frame_with_mask.png")
     print("  scores.csv")
 
+    # Overlay video and best frame images.
+    overlay_args = (refined, best, input_box, fps, (width, height))
+    if overlay == "inline":
+        render_overlay(*overlay_args)
+    elif overlay == "deferred":
+        # Rendered after the score is returned; non-daemon so a CLI run still finishes it.
+        threading.Thread(target=render_overlay, args=overlay_args, name="overlay").start()
+
+    if best_frame_idx < 0:
+        return None
+    return best_score
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze splash videos and generate scoring data")
-    parser.add_argument("--video", type=str, required=True, help="Path to input video file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", type=str, help="Path to input video file")
+    source.add_argument(
+        "--stream", type=str, help="Shell command writing raw bgr24 frames to stdout"
+    )
+    parser.add_argument("--width", type=int, default=1280, help="Frame width of --stream")
+    parser.add_argument("--height", type=int, default=720, help="Frame height of --stream")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate of --stream")
+    parser.add_argument("--frames", type=int, default=0, help="Expected frame count of --stream")
+    parser.add_argument(
+        "--batch-size", type=int, default=SAM_BATCH_SIZE, help="Refine frames per SAM forward pass"
+    )
+    parser.add_argument(
+        "--overlay", choices=OVERLAY_MODES, default=OVERLAY_MODE, help="Overlay rendering mode"
+    )
     args = parser.parse_args()
-    # Fixed box - this will need to be adjusted later when we have a set angle.
-    #INPUT_BOX = np.array([400, 50, 1250, 650])
-    # TEST
-    INPUT_BOX = np.array([700, 200, 1000, 600])      
-    #INPUT_BOX = np.array([900, 400, 1100, 550])
-    process_video(args.video, INPUT_BOX)
+    video = args.video
+    if args.stream:
+        video = PipeCapture(args.stream, args.width, args.height, args.fps, args.frames)
+    process_video(video, INPUT_BOX, sam_batch_size=args.batch_size, overlay=args.overlay)
@@ -13,7 +13,7 @@ Dependencies:
 - ffmpeg (for video recording)
 - scp (for file transfer)
 - pandas (for CSV processing)
-- SAM2 analysis pipeline (manumeter.py)
+- SAM2 analysis pipeline (manumeter.py, served warm by worker.py)
 
 Configuration:
 - Raspberry Pi connection details
@@ -21,16 +21,27 @@ Configuration:
 - File paths and directories
 """
 
+import argparse
+import bisect
+import shlex
 import shutil
+import sqlite3
 import subprocess
+import sys
 import time
 import os
 import json
+import queue
+import threading
 import pandas as pd
-from operator import itemgetter
 import time
 import random
 
+import history
+import jobs
+import store
+import worker
+
 # Configuration constants.
  # Raspberry Pi username.
 PI_USER = "ju30" 
@@ -38,41 +49,52 @@ PI_USER = "ju30"
 PI_IP = "10.199.148.133"  
 # Path on the Pi to save recorded video.
 PI_VIDEO_PATH = "/home/ju30/splash.mp4" 
+# Recording size, frame rate and length.
+VIDEO_SIZE = (1280, 720)
+VIDEO_FPS = 30
+VIDEO_SECONDS = 5
+
+# Stream the recording back over ssh and score it while it records, instead of
+# recording on the Pi and then copying the file over with scp.
+STREAM_MODE = os.getenv("SPLASH_STREAM", "0") == "1"
+# Local video file or named pipe streamed in place of the Pi camera (for testing).
+STREAM_SOURCE = os.getenv("SPLASH_STREAM_SOURCE")
 
 # Local file paths
 WIN_SAVE_DIR = r"..\videos"  
-RESULTS_DIR = r"..\results"
+RESULTS_DIR = os.path.join("..", "results")
 # Analysis script to run.
 PROCESS_SCRIPT = "manumeter.py"  
+# Seconds a console command (ssh, ffmpeg, scp) may take before it is killed.
+CMD_TIMEOUT = float(os.getenv("SPLASH_CMD_TIMEOUT", "60"))
+# Seconds the manumeter.py fallback may take, it loads SAM2 every time.
+ANALYSIS_TIMEOUT = float(os.getenv("SPLASH_ANALYSIS_TIMEOUT", "600"))
 # Scores CSV path.
 SCORES_CSV = os.path.join(RESULTS_DIR, "scores.csv")
 # Leaderboard JSON file path.
 LEADERBOARD_FILE = "leaderboard.json"  
 #Stats file, also doubles as prompt to update frontend when updated.
 STATS_FILE = "stats.json"
+# Every jump, not just the top 25, for the daily and weekly leaderboards.
+jump_history = history.JumpHistory()
 
-def update_stats(latest_score, username):
+def update_stats(latest_score, username, latest_rank=None):
     """
-    Updates the stats.json file with the total jump count and the most recent score.
+    Updates the stats.json file with the total jump count and the most recent score
+    and leaderboard position (None if it didn't make the leaderboard).
+
+    The read-modify-write happens under the stats file lock so concurrent jumps
+    can't lose a count, and the file is replaced atomically.
     """
-    stats = {"total_jumps": 0, "latest_score": 0.0, "latest_username": "None"}
-    
-    # Load existing stats if file exists
-    if os.path.exists(STATS_FILE):
-        try:
-            with open(STATS_FILE, "r") as f:
-                stats = json.load(f)
-        except Exception as e:
-            print(f"Error loading stats: {e}")
-
-    # Update values
-    stats["total_jumps"] += 1
-    stats["latest_score"] = float(latest_score)
-    stats["latest_username"] = username
-
-    # Save back to file
-    with open(STATS_FILE, "w") as f:
-        json.dump(stats, f, indent=2)
+    def bump(stats):
+        stats["total_jumps"] += 1
+        stats["latest_score"] = float(latest_score)
+        stats["latest_username"] = username
+        stats["latest_rank"] = latest_rank
+        return stats
+
+    default = {"total_jumps": 0, "latest_score": 0.0, "latest_username": "None"}
+    stats = store.update_json(STATS_FILE, bump, default)
     print(f"Stats updated: Total Jumps = {stats['total_jumps']}")
 
 # Number of top scores to keep
@@ -86,24 +108,28 @@ def random_name_generator():
     return f"{random.choice(adjective)}{random.choice(creature)}{number}"
 
 # Running console commands.
-def run_cmd(cmd):
+def run_cmd(cmd, timeout=CMD_TIMEOUT):
     """
     Execute a shell command and capture its output.
 
     Args:
         cmd (str): The command to execute
+        timeout (float): Seconds before the command and anything it started are killed
 
     Returns:
         bool: True if command executed successfully (return code 0), False otherwise
     """
     print(f"Running: {cmd}")
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = jobs.run_process(cmd, timeout, shell=True)
         if result.stdout:
             print(result.stdout)
         if result.stderr:
             print(result.stderr)
         return result.returncode == 0
+    except subprocess.TimeoutExpired:
+        print(f"Command timed out after {timeout:g}s")
+        return False
     except Exception as e:
         print(f"Command failed: {e}")
         return False
@@ -147,9 +173,7 @@ def load_leaderboard():
     Returns:
         list: List of leaderboard entries, empty list if file doesn't exist
     """
-    if os.path.exists(LEADERBOARD_FILE):
-        return json.load(open(LEADERBOARD_FILE, "r"))
-    return []
+    return store.read_json(LEADERBOARD_FILE, [])
 
 
 # Dumps leaderboard into json
@@ -160,7 +184,7 @@ def save_leaderboard(lb):
     Args:
         lb (list): Leaderboard entries to save
     """
-    json.dump(lb, open(LEADERBOARD_FILE, "w"), indent=2)
+    store.write_json_atomic(LEADERBOARD_FILE, lb)
 
 
 # # Method to properly rename files, helps with overwriting old files, and pushing data to the frontend as it makes the names consistent.
@@ -204,7 +228,7 @@ def save_leaderboard(lb):
 
 
 # Method to record video from the Raspberry Pi..
-def record_video():
+def record_video(pi_path=PI_VIDEO_PATH):
     """
     Record a 5-second video on the Raspberry Pi using ffmpeg.
 
@@ -212,6 +236,9 @@ def record_video():
     - MJPEG input at 1280x720 resolution, 30 FPS
     - Brightness, contrast, saturation adjustments
 
+    Args:
+        pi_path (str): Where to save the video on the Pi
+
     Returns:
         bool: True if recording succeeded, False otherwise
     """
@@ -223,30 +250,101 @@ def record_video():
         f"ffmpeg -hide_banner -loglevel error "
         f"-y -f v4l2 "
         f"-input_format mjpeg "
-        f"-video_size 1280x720 "
-        f"-i /dev/video0 -t 5 "
-        f'-vf "eq=brightness=0.05:contrast=1.3:saturation=1.2,fps=30" '
+        f"-video_size {VIDEO_SIZE[0]}x{VIDEO_SIZE[1]} "
+        f"-i /dev/video0 -t {VIDEO_SECONDS} "
+        f'-vf "eq=brightness=0.05:contrast=1.3:saturation=1.2,fps={VIDEO_FPS}" '
         f"-vsync cfr "
         f"-c:v libx264 -pix_fmt yuv420p "
         f"-crf 18 -preset veryfast "
-        f"{PI_VIDEO_PATH}"
+        f"{pi_path}"
     )
 
     return run_cmd(ffmpeg_cmd)
 
 
+# Settings of a streamed recording.
+def stream_settings(local_path):
+    """
+    Describe the streaming mode recording for worker.stream_cmd().
+
+    The Pi records exactly as record_video() does but writes MPEG-TS over the ssh
+    connection instead of to a file. If STREAM_SOURCE is set, that local file or
+    pipe is streamed in real time instead of the Pi camera.
+
+    Args:
+        local_path (str): Where to save the local copy of the recording
+
+    Returns:
+        dict: worker.stream_cmd() arguments
+    """
+    return {
+        "pi_user": PI_USER,
+        "pi_host": PI_IP,
+        "size": list(VIDEO_SIZE),
+        "fps": VIDEO_FPS,
+        "seconds": VIDEO_SECONDS,
+        "local_path": local_path,
+        "source": STREAM_SOURCE,
+    }
+
+
+# Records and scores at the same time.
+def stream_video(local_path=None):
+    """
+    Record on the Pi and analyse the frames as they arrive.
+
+    The coarse pass runs while the jump is still being recorded and there is no
+    separate download step. The recording is still saved locally.
+
+    Args:
+        local_path (str): Where to save the recording (default: videos/splash_.ts)
+
+    Returns:
+        tuple: (local_path, score), score is None if recording or analysis failed
+    """
+    print("Recording (streaming)...")
+    if local_path is None:
+        local_path = os.path.join(WIN_SAVE_DIR, "splash_.ts")
+    settings = stream_settings(local_path)
+
+    try:
+        result = worker.submit_stream(settings, timeout=ANALYSIS_TIMEOUT)
+    except TimeoutError as e:
+        print(f"Scoring worker failed: {e}")
+        score = None
+    except ConnectionError:
+        print("Scoring worker not running, starting analysis script.")
+        cmd = worker.stream_cmd(**settings)
+        analysis_cmd = (
+            f'python "{PROCESS_SCRIPT}" --stream {shlex.quote(cmd)} '
+            f"--width {VIDEO_SIZE[0]} --height {VIDEO_SIZE[1]} --fps {VIDEO_FPS} "
+            f"--frames {VIDEO_SECONDS * VIDEO_FPS}"
+        )
+        score = run_analysis_script(analysis_cmd)
+    else:
+        score = worker_score(result)
+    if score is not None:
+        keep_scores(local_path)
+    return local_path, score
+
+
 # Downloads the recorded video from the pi.
-def download_video():
+def download_video(local_path=None, pi_path=PI_VIDEO_PATH):
     """
     Download the recorded video from Raspberry Pi to local storage.
 
+    Args:
+        local_path (str): Where to save the video (default: videos/splash_.mp4)
+        pi_path (str): Where the video was saved on the Pi
+
     Returns:
         str or None: Local path to downloaded video, or None if download failed
     """
     print("Downloading video...")
 
-    local_path = os.path.join(WIN_SAVE_DIR, "splash_.mp4")
-    scp_cmd = f'scp {PI_USER}@{PI_IP}:{PI_VIDEO_PATH} "{local_path}"'
+    if local_path is None:
+        local_path = os.path.join(WIN_SAVE_DIR, "splash_.mp4")
+    scp_cmd = f'scp {PI_USER}@{PI_IP}:{pi_path} "{local_path}"'
 
     if run_cmd(scp_cmd):
         print(f"Saved video to: {local_path}")
@@ -261,7 +359,8 @@ def analyze_video(local_video):
     """
     Run the splash analysis algorithm on the downloaded video.
 
-    Executes manumeter.py to process the video and get relevant scores.
+    Sends the video to the scoring worker, which keeps SAM2 loaded between jumps.
+    If no worker is running, executes manumeter.py to process the video instead.
 
     Args:
         local_video (str): Path to the local video file to analyze
@@ -270,10 +369,92 @@ def analyze_video(local_video):
         The resulting score from the analysis. None if analysis failed.
     """
     print("Running algorithm...")
-    # Runs the SAM2 video algorithm script.
-    cmd = f'python "{PROCESS_SCRIPT}" --video "{local_video}"'
+    try:
+        result = worker.submit(local_video, timeout=ANALYSIS_TIMEOUT)
+    except TimeoutError as e:
+        print(f"Scoring worker failed: {e}")
+        score = None
+    except ConnectionError:
+        print("Scoring worker not running, starting analysis script.")
+        # Runs the SAM2 video algorithm script.
+        score = run_analysis_script(f'python "{PROCESS_SCRIPT}" --video "{local_video}"')
+    else:
+        score = worker_score(result)
+    if score is not None:
+        keep_scores(local_video)
+    return score
+
+
+# Reads the score out of a scoring worker reply.
+def worker_score(result):
+    """
+    Get the score from a scoring worker reply.
+
+    Args:
+        result (dict): Reply from worker.submit() or worker.submit_stream()
+
+    Returns:
+        The resulting score from the analysis. None if analysis failed.
+    """
+    if not result["ok"]:
+        print(f"Scoring worker failed: {result['error']}")
+        return None
+    if result["score"] is None:
+        print("No frames were analysed.")
+        return None
+    max_score = float(result["score"])
+    print(f"Max score: {max_score:.1f}")
+    return max_score
+
+
+# Per-jump copy of scores.csv, kept next to the recording.
+def scores_path(local_video):
+    return os.path.splitext(local_video)[0] + "_scores.csv"
+
+
+# Keeps a jump's frame metrics until it is published, as the next jump overwrites scores.csv.
+def keep_scores(local_video):
+    if os.path.exists(SCORES_CSV):
+        shutil.copyfile(SCORES_CSV, scores_path(local_video))
+
+
+# Adds a published jump and its frame metrics to the jump history.
+def record_history(local_video, username, score):
+    """
+    Record a jump in the history database.
+
+    The recording's path isn't stored: keep_latest() moves it to videos/splash_
+    straight after, where the next jump replaces it.
+
+    Args:
+        local_video (str): Path of the job's recording, locates its scores.csv
+        username (str): Name of the competitor
+        score (float): Best score of the jump
+    """
+    csv_path = scores_path(local_video)
+    frames = history.read_frame_metrics(csv_path)
+    try:
+        jump_history.record(username, score, frames)
+    except sqlite3.Error as e:
+        print(f"Error recording jump history: {e}")
+        return
+    if os.path.exists(csv_path):
+        os.remove(csv_path)
+
+
+# Fallback when no scoring worker is running.
+def run_analysis_script(cmd):
+    """
+    Run manumeter.py as a script and read the max score from scores.csv.
+
+    Args:
+        cmd (str): manumeter.py command line to run
+
+    Returns:
+        The resulting score from the analysis. None if analysis failed.
+    """
     # If that command doesn't exist, terminate.
-    if not run_cmd(cmd):
+    if not run_cmd(cmd, ANALYSIS_TIMEOUT):
         print("Error occured running algorithm script.")
         return None
     # If the scores.csv doesn't exist, terminate.
@@ -293,26 +474,48 @@ def update_leaderboard(score, video_path, username):
     """
     Update the leaderboard with a new splash score and manage top entries.
 
-    Adds the new score, sorts the leaderboard, keeps only top 3 entries,
-    and manages file cleanup for removed entries.
+    The leaderboard is kept sorted best first, so the new score's place is found
+    with a binary search and only the top TOP_25 entries are kept.
 
     Args:
         score (float): The splash score to add
         video_path (str): Path to the video file for this score
+
+    Returns:
+        int or None: Leaderboard position of the new score (1 is best), None if it
+            didn't make the top TOP_25
     """
+    with store.locked(LEADERBOARD_FILE):
+        top3, rank = _insert_score(score, username)
+    print("\nUpdated leaderboard:")
+    # Prints out the top 3.
+    for i, e in enumerate(top3, start=1):
+        print(f"{i}: Score={e['score']:.1f}")  # , Video={os.path.basename(e['video'])}
+    print(f"Placed #{rank}" if rank is not None else f"Outside the top {TOP_25}")
+    return rank
+
+
+# Sort key for a leaderboard sorted by descending score.
+def _neg_score(entry):
+    return -entry["score"]
+
+
+# Leaderboard read-modify-write, called with the leaderboard lock held.
+def _insert_score(score, username):
     lb = load_leaderboard()
 
     # add new result
-    lb.append(
-        {
-            "username": username,
-            "score": float(score),
-            # "video": video_path,
-            # "thumbnail": os.path.join(RESULTS_DIR, "best_splash_frame.png"),
-        }
-    )
-    # Sort and keep top 3.
-    lb.sort(key=itemgetter("score"), reverse=True)
+    entry = {
+        "username": username,
+        "score": float(score),
+        # "video": video_path,
+        # "thumbnail": os.path.join(RESULTS_DIR, "best_splash_frame.png"),
+    }
+    # Insert after any equal scores, so earlier jumps keep their place, and keep top 3.
+    index = bisect.bisect_right(lb, -entry["score"], key=_neg_score)
+    if index >= TOP_25:
+        return lb[:TOP_25], None
+    lb.insert(index, entry)
     top3 = lb[:TOP_25]
     # to_delete = lb[TOP_25:]
 
@@ -340,26 +543,17 @@ def update_leaderboard(score, video_path, username):
     #         entry["thumbnail"] = new_thumb
     # Updates the leaderboard.
     save_leaderboard(top3)
-    print("\nUpdated leaderboard:")
-    # Prints out the top 3.
-    for i, e in enumerate(top3, start=1):
-        print(f"{i}: Score={e['score']:.1f}")  # , Video={os.path.basename(e['video'])}
+    return top3, index + 1
 
 
-def main():
+# Countdown before recording starts.
+def countdown(username):
     """
-    Main pipeline execution function.
+    Announce the competitor and count down to the jump.
 
-    Orchestrates the complete splash scoring workflow:
-    1. Record video from Raspberry Pi
-    2. Download video to local storage
-    3. Run computer vision analysis
-    4. Update leaderboard with results
-    5. Normalize filenames for frontend display.
+    Args:
+        username (str): Name of the competitor
     """
-    start_time = time.time()
-
-    username = random_name_generator()
     print(f"\nCurrent Competitor: {username}\n")
 
     # Writes to the console to show the program is starting.
@@ -376,28 +570,274 @@ def main():
     time.sleep(1)
     print("Jump!\n")
 
-    # If there is an issue recording video, terminate.
-    if not record_video():
-        return
 
+# Hands a stage result back to the splash scoring API.
+def emit_result(result):
+    """
+    Print a stage result as the last line of output, for the API's job queue to read.
+
+    Args:
+        result (dict): JSON-serialisable stage result
+    """
+    print("RESULT " + json.dumps(result))
+
+
+# Stage 1 for the API job queue: needs the camera.
+def capture_stage(job_id, username=None):
+    """
+    Count down and record one jump into its own video file.
+
+    In streaming mode the jump is scored while it records, so the score is
+    returned as well. The scoring worker only replies once the SAM pass has
+    finished, so in streaming mode the camera is held until the jump is scored
+    and the next jump can't record during it.
+
+    Args:
+        job_id (str): Queue job id, used to name the video file
+        username (str): Name of the competitor, generated if None
+
+    Returns:
+        dict or None: {"video": str, "username": str, "score": float or None},
+            None if recording failed
+    """
+    if username is None:
+        username = random_name_generator()
+    countdown(username)
+    if STREAM_MODE:
+        local_video, score = stream_video(os.path.join(WIN_SAVE_DIR, f"splash_{job_id}.ts"))
+        if score is None:
+            return None
+        return {"video": local_video, "username": username, "score": score}
+
+    if not record_video():
+        return None
     time.sleep(1)
-    # If there is an issue downloading video, terminate.
-    local_video = download_video()
+    local_video = download_video(os.path.join(WIN_SAVE_DIR, f"splash_{job_id}.mp4"))
     if not local_video:
-        return
+        return None
+    return {"video": local_video, "username": username, "score": None}
 
-    # If there is an issue analysing video, terminate.
-    score = analyze_video(local_video)
-    if score is None:
-        return
 
-    # Update stats file, also prompts frontend update.
-    update_stats(score, username)
-    
-    # Update the leaderboard and rename the files when the analysis is finished.
-    update_leaderboard(score, local_video, username)
-    # normalize_filenames()
-    print("\nFinished.")
+# Stage 2 for the API job queue: scoring and publishing, camera not needed.
+def score_stage(local_video, username, score=None):
+    """
+    Score a recorded jump (unless already scored) and publish it.
+
+    The job's video then replaces videos/splash_ as the latest recording.
+
+    Args:
+        local_video (str): Path of the job's recording
+        username (str): Name of the competitor
+        score (float): Score from capture_stage(), analysed here if None
+
+    Returns:
+        dict or None: {"username": str, "score": float, "rank": int or None},
+            None if analysis failed
+    """
+    jump = {"video": local_video, "username": username, "score": score}
+    if not score_jump(jump):
+        return None
+    publish_jump(jump)
+    return {"username": username, "score": jump["score"], "rank": jump["rank"]}
+
+
+# Keeps a job's recording as the latest video.
+def keep_latest(local_video):
+    """
+    Move a job's recording to videos/splash_ (same extension), replacing the previous one.
+
+    Args:
+        local_video (str): Path of the job's recording
+    """
+    if local_video and os.path.exists(local_video):
+        latest = os.path.join(WIN_SAVE_DIR, "splash_" + os.path.splitext(local_video)[1])
+        os.replace(local_video, latest)
+
+
+# Jumps allowed to wait between two pipeline stages before capture blocks.
+STAGE_QUEUE_SIZE = 2
+# Pipeline stages in order, for the timing report.
+STAGES = ("capture", "transfer", "score", "publish")
+
+
+# Pipeline stage: copy the recording off the Pi.
+def transfer_jump(jump):
+    """
+    Download a jump's recording from the Pi, then delete it there once it is safely local.
+
+    Streamed jumps are already local and scored, so there is nothing to do.
+
+    Args:
+        jump (dict): Jump being processed by the pipeline
+
+    Returns:
+        bool: True if the stage succeeded
+    """
+    if jump["score"] is not None:
+        return True
+    time.sleep(1)
+    jump["video"] = download_video(jump["video"], jump["pi_path"])
+    # A failed download leaves the Pi's copy as the only one, so keep it.
+    if jump["video"] is None:
+        return False
+    run_cmd(f"ssh {PI_USER}@{PI_IP} rm -f {shlex.quote(jump['pi_path'])}")
+    return True
+
+
+# Pipeline stage: analyse the recording.
+def score_jump(jump):
+    """
+    Score a jump's recording, unless it was already scored while streaming.
+
+    Args:
+        jump (dict): Jump being processed by the pipeline
+
+    Returns:
+        bool: True if the stage succeeded
+    """
+    if jump["score"] is None:
+        jump["score"] = analyze_video(jump["video"])
+    return jump["score"] is not None
+
+
+# Pipeline stage: update stats and leaderboard.
+def publish_jump(jump):
+    """
+    Publish a scored jump to the stats and leaderboard files.
+
+    Args:
+        jump (dict): Jump being processed by the pipeline
+
+    Returns:
+        bool: True if the stage succeeded
+    """
+    # Update the leaderboard when the analysis is finished.
+    jump["rank"] = update_leaderboard(jump["score"], jump["video"], jump["username"])
+    record_history(jump["video"], jump["username"], jump["score"])
+    # Update stats file last, also prompts frontend update.
+    update_stats(jump["score"], jump["username"], jump["rank"])
+    keep_latest(jump["video"])
+    return True
+
+
+# Per-jump timing report.
+def print_timings(jump):
+    """Print how long each stage took for a jump, and the jump's total time."""
+    timings = ", ".join(
+        f"{stage} {jump['timings'][stage]:.1f}s" for stage in STAGES if stage in jump["timings"]
+    )
+    total = time.time() - jump["start"]
+    print(f"\nJump {jump['n']} ({jump['username']}): {timings}, total {total:.1f}s")
+
+
+# Adapts a pipeline stage for jobs.stage_loop().
+def timed_stage(name, stage):
+    """
+    Wrap a stage function so it records its timing and passes the jump on if it succeeded.
+
+    Args:
+        name (str): Stage name, used for timings
+        stage (callable): Stage function, returns True on success
+
+    Returns:
+        callable: Stage for jobs.stage_loop(), returns the jump or None
+    """
+    def run(jump):
+        stage_start = time.time()
+        try:
+            ok = stage(jump)
+        finally:
+            jump["timings"][name] = time.time() - stage_start
+        if ok and name == STAGES[-1]:
+            print_timings(jump)
+        return jump if ok else None
+
+    return run
+
+
+# Failure report for jobs.stage_loop().
+def stage_failed(jump, name, error):
+    """Report a jump that failed at a pipeline stage."""
+    print(f"Jump {jump['n']} failed at {name} stage: {error}")
+    print_timings(jump)
+
+
+def main(jumps=1):
+    """
+    Main pipeline execution function.
+
+    Runs the splash scoring workflow as a pipeline of stages connected by queues:
+    1. Capture: countdown and record video on the Raspberry Pi (this thread)
+    2. Transfer: download video to local storage
+    3. Score: run computer vision analysis
+    4. Publish: update stats and leaderboard with results
+
+    Each stage has its own thread, so the next jumper's countdown and recording
+    start while the previous clip is still being transferred or scored. Timings
+    for each stage are printed when a jump finishes.
+
+    In streaming mode a jump is recorded and scored together in the capture step,
+    so jumps run one after another and only publishing overlaps the next jump.
+
+    Args:
+        jumps (int): Number of jumps to run back to back
+    """
+    start_time = time.time()
+    run_id = time.strftime("%Y%m%d%H%M%S")
+
+    transfer_queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+    score_queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+    publish_queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+    stages = (
+        ("transfer", transfer_jump, transfer_queue, score_queue),
+        ("score", score_jump, score_queue, publish_queue),
+        ("publish", publish_jump, publish_queue, None),
+    )
+    threads = [
+        threading.Thread(
+            target=jobs.stage_loop,
+            args=(name, timed_stage(name, stage), in_queue, out_queue, stage_failed),
+        )
+        for name, stage, in_queue, out_queue in stages
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for n in range(1, jumps + 1):
+            job_id = f"{run_id}_{n}"
+            jump = {
+                "n": n,
+                "username": random_name_generator(),
+                "score": None,
+                "video": os.path.join(WIN_SAVE_DIR, f"splash_{job_id}.mp4"),
+                "pi_path": PI_VIDEO_PATH.replace(".mp4", f"_{job_id}.mp4"),
+                "start": time.time(),
+                "timings": {},
+            }
+            countdown(jump["username"])
+
+            if STREAM_MODE:
+                # Recording and analysis happen together, nothing to download.
+                jump["video"], jump["score"] = stream_video(
+                    os.path.join(WIN_SAVE_DIR, f"splash_{job_id}.ts")
+                )
+                ok = jump["score"] is not None
+            else:
+                ok = record_video(jump["pi_path"])
+            jump["timings"]["capture"] = time.time() - jump["start"]
+
+            # If there is an issue recording video, skip this jump.
+            if not ok:
+                print(f"Jump {n} failed at capture stage.")
+                continue
+            # Blocks only if the later stages have fallen STAGE_QUEUE_SIZE jumps behind.
+            transfer_queue.put(jump)
+    finally:
+        transfer_queue.put(None)
+        for thread in threads:
+            thread.join()
+
     end_time = time.time()
     elapsed = end_time - start_time
     minutes, seconds = divmod(elapsed, 60)
@@ -405,4 +845,29 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Record, score and publish splash jumps")
+    sub = parser.add_subparsers(dest="stage")
+
+    capture = sub.add_parser("capture", help="Record one jump for a queued job")
+    capture.add_argument("--job-id", required=True, help="Queue job id, names the video file")
+    capture.add_argument("--username", help="Name of the competitor, generated if not given")
+
+    score = sub.add_parser("score", help="Score and publish a recorded jump")
+    score.add_argument("--video", required=True, help="Path of the recording")
+    score.add_argument("--username", required=True, help="Name of the competitor")
+    score.add_argument("--score", type=float, help="Score from the capture stage, if already scored")
+
+    parser.add_argument("--jumps", type=int, default=1, help="Jumps to run back to back")
+
+    args = parser.parse_args()
+    if args.stage == "capture":
+        result = capture_stage(args.job_id, args.username)
+    elif args.stage == "score":
+        result = score_stage(args.video, args.username, args.score)
+    else:
+        main(args.jumps)
+        sys.exit(0)
+
+    if result is None:
+        sys.exit(1)
+    emit_result(result)
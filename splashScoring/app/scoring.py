@@ -0,0 +1,274 @@
+"""
+ManuMeter splash measurement and coarse scoring
+
+Measures a splash mask, scores it and runs the first (colour threshold) pass that
+finds the approximate peak frame of a clip. Only needs OpenCV and NumPy, so it can
+be imported and tested without torch or SAM 2; manumeter.py builds the SAM
+refinement on top of it.
+"""
+
+import os
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Fixed box - this will need to be adjusted later when we have a set angle.
+#INPUT_BOX = np.array([400, 50, 1250, 650])
+# TEST
+INPUT_BOX = np.array([700, 200, 1000, 600])
+#INPUT_BOX = np.array([900, 400, 1100, 550])
+
+# First pass stops early once EARLY_EXIT_WINDOW scored frames in a row fall below
+# EARLY_EXIT_RATIO of the peak score, but only after a peak of at least
+# EARLY_EXIT_MIN_AREA pixels, so a small noise blob before the jump can't end the scan
+# before the splash. A ratio of 0 always scans the whole clip.
+EARLY_EXIT_RATIO = float(os.getenv("MANUMETER_EARLY_EXIT_RATIO", "0.5"))
+EARLY_EXIT_WINDOW = int(os.getenv("MANUMETER_EARLY_EXIT_WINDOW", "3"))
+EARLY_EXIT_MIN_AREA = int(os.getenv("MANUMETER_EARLY_EXIT_MIN_AREA", "1000"))
+
+
+# Measuring the splash based on the provided mask.
+def measure_splash(mask):
+    """
+    Calculate dimensions of a splash mask.
+
+    Extents come from row/column projections and the hull from the leftmost and
+    rightmost pixel of each row, which have the same convex hull as the whole mask,
+    so no contours or pixel coordinate lists are built.
+
+    Args:
+        mask (numpy.ndarray): 2D mask, bool or 0/1 values
+    Returns:
+        tuple: (area, hull_area, height, width)
+            - area (int): Number of pixels in the mask
+            - hull_area (int): Area of the convex hull of the splash
+            - height (int): Height of the bounding box in pixels
+            - width (N/A for now): Width of the bounding box in pixels
+    """
+    # uint8 view of the mask, only copied when it isn't bool or uint8 already.
+    if mask.dtype == np.bool_:
+        mask_u8 = mask.view(np.uint8)
+    elif mask.dtype == np.uint8:
+        mask_u8 = mask
+    else:
+        mask_u8 = (mask != 0).view(np.uint8)
+
+    # Number of pixels = area.
+    area = int(np.count_nonzero(mask_u8))
+    if area == 0:
+        return 0, 0, 0, 0
+
+    # Rows and columns that contain the splash.
+    rows = np.flatnonzero(np.any(mask_u8, axis=1))
+    cols = np.flatnonzero(np.any(mask_u8, axis=0))
+    # Gets the height and width of the mask.
+    height = int(rows[-1] - rows[0])
+    # Width is irrelevant now. Can be added later, but I don't believe it to be useful to scoring.
+    width = int(cols[-1] - cols[0])
+
+    # Leftmost and rightmost pixel of each occupied row inside the bounding box.
+    box = mask_u8[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+    occupied = rows - rows[0]
+    box = box[occupied]
+    left = box.argmax(axis=1)
+    right = box.shape[1] - 1 - box[:, ::-1].argmax(axis=1)
+    ys = np.concatenate((rows, rows))
+    xs = np.concatenate((left, right)) + cols[0]
+    points = np.stack((xs, ys), axis=1).astype(np.int32)
+
+    # Hull of every splash pixel, merged across separate blobs.
+    hull = cv2.convexHull(points)
+    hull_area = int(cv2.contourArea(hull))
+    # Return values
+    return area, hull_area, height, width
+
+# Basic scoring system, based on my interpretation, subject to change.
+# Max areas are adjusted based on first run throughs to ensure a proper scoring. (View scores.csv)
+def manu_score(area, hull_area, height, AREA_MAX=10000, HULL_MAX=100000, HEIGHT_MAX=400):
+    """
+    Calculate a splash score based on measured metrics.
+
+    The score is a weighted combination of normalized height, area, and convex hull area.
+    Weights are: 60% height, 35% area, 5% convex hull area.
+
+    Args:
+        area (int): Pixel area of the splash
+        hull_area (int): Area of the convex hull
+        height (int): Height of the splash in pixels
+        AREA_MAX (int): Maximum expected area
+        HULL_MAX (int): Maximum expected hull area
+        HEIGHT_MAX (int): Maximum expected height
+
+    Returns:
+        float: Score between 0 and 100
+    """
+    H = min(height / HEIGHT_MAX, 1.0) * 100
+    A = min(area / AREA_MAX, 1.0) * 100
+    C = min(hull_area / HULL_MAX, 1.0) * 100
+    # Abstract scoring, will be adjusted later.
+    score = 0.6 * H + 0.35 * A + 0.05 * C
+    # Score must not exceed 100, as it is the max end of the scale.
+    if score > 100:
+        score = 100
+    return score
+
+
+# Coarse colour mask of one frame, measured.
+def coarse_measure(frame, input_box, buffers=None):
+    """
+    Measure the splash in a frame using simple colour thresholding inside the input box.
+
+    Only the input box is converted and thresholded, and the mask is measured in
+    box coordinates (area, hull area and height do not depend on the offset).
+
+    Args:
+        frame (numpy.ndarray): BGR frame
+        input_box (numpy.ndarray): Bounding box [x1, y1, x2, y2] for splash detection region
+        buffers (dict): Optional scratch buffers reused across calls, filled on first use
+
+    Returns:
+        tuple: (area, hull_area, height, width) of the colour mask, see measure_splash()
+    """
+    if buffers is None:
+        buffers = {}
+    x1, y1, x2, y2 = input_box
+    roi = frame[y1:y2, x1:x2]
+
+    # Simple masking using colours. Needs adjusting depending on environment.
+    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV, dst=buffers.get("hsv"))
+    #ADJUST 135 higher for brighter days, ADJUST 80 to filter out blues and greens
+    #splash_mask = cv2.inRange(hsv, (0, 0, 220), (180, 80, 255))
+    splash_mask = cv2.inRange(hsv, (0, 20, 220), (180, 40, 255), dst=buffers.get("mask"))
+    np.floor_divide(splash_mask, 255, out=splash_mask)
+    buffers["hsv"] = hsv
+    buffers["mask"] = splash_mask
+    # Measure the splash dimensions.
+    return measure_splash(splash_mask)
+
+
+# Coarse colour score of one frame, used to find the approximate peak.
+def coarse_score(frame, input_box, min_area=100, buffers=None):
+    """
+    Score a frame using simple colour thresholding inside the input box.
+
+    Args:
+        frame (numpy.ndarray): BGR frame
+        input_box (numpy.ndarray): Bounding box [x1, y1, x2, y2] for splash detection region
+        min_area (int): Minimum pixel area to consider as a valid splash
+        buffers (dict): Optional scratch buffers reused across calls, filled on first use
+
+    Returns:
+        float: Approximate splash score for the frame
+    """
+    return mask_score(coarse_measure(frame, input_box, buffers), min_area)
+
+
+# Score of a measured mask, 0 if it is too small to be a splash.
+def mask_score(measurement, min_area=100):
+    """
+    Score a measured mask.
+
+    Args:
+        measurement (tuple): (area, hull_area, height, width) from measure_splash()
+        min_area (int): Minimum pixel area to consider as a valid splash
+
+    Returns:
+        float: Splash score, 0 if the area is below min_area
+    """
+    area, hull_area, height_mask, width_mask = measurement
+    # If area is too small, score is 0, otherwise process normally.
+    return (
+        0
+        if area < min_area
+        else manu_score(area, hull_area, height_mask, width_mask)
+    )
+
+
+# Single decode of the video: finds the peak and keeps the frames around it.
+def coarse_pass(
+    cap,
+    input_box,
+    min_area=100,
+    first_pass=3,
+    refine_range=5,
+    decay_ratio=EARLY_EXIT_RATIO,
+    decay_window=EARLY_EXIT_WINDOW,
+    min_peak_area=EARLY_EXIT_MIN_AREA,
+):
+    """
+    Scan the video once to find the approximate peak frame.
+
+    Every frame is read exactly once and the stream is never seeked. The last
+    refine_range frames are held in a ring buffer so that when a new peak is found
+    the frames before it are already in memory, and the frames after it are
+    collected as the scan continues.
+
+    Once the splash has clearly peaked and decayed (a peak of at least min_peak_area
+    pixels, then decay_window scored frames in a row below decay_ratio of it, with the
+    refine window complete) the scan stops early rather than reading the rest of the clip.
+
+    Args:
+        cap (cv2.VideoCapture): Opened capture positioned at the first frame
+        input_box (numpy.ndarray): Bounding box [x1, y1, x2, y2] for splash detection region
+        min_area (int): Minimum pixel area to consider as a valid splash
+        first_pass (int): Score every first_pass-th frame
+        refine_range (int): Frames either side of the peak to keep for refinement
+        decay_ratio (float): Fraction of the peak score a frame must drop below to count as decayed, 0 disables early exit
+        decay_window (int): Consecutive decayed scored frames needed to stop early
+        min_peak_area (int): Pixel area the peak must reach before the scan can stop early
+
+    Returns:
+        tuple: (peak_idx, peak_score, refine_frames, frames_read)
+            - peak_idx (int): Index of the approximate peak frame, -1 if no frames were read
+            - peak_score (float): Coarse score of the peak frame
+            - refine_frames (list): (idx, frame) pairs from peak - refine_range to peak + refine_range
+            - frames_read (int): Frames read before the scan ended
+    """
+    recent = deque(maxlen=refine_range)
+    buffers = {}
+    refine_frames = []
+    peak_score = -1
+    peak_idx = -1
+    peak_area = 0
+    # Scored frames in a row below decay_ratio of the peak.
+    decayed = 0
+
+    idx = -1
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        idx += 1
+
+        if idx % first_pass == 0:
+            measurement = coarse_measure(frame, input_box, buffers)
+            splash_score = mask_score(measurement, min_area)
+            # New peak, restart the refine window from the buffered frames before it.
+            if splash_score > peak_score:
+                peak_score = splash_score
+                peak_idx = idx
+                peak_area = measurement[0]
+                decayed = 0
+                refine_frames = [f for f in recent if f[0] >= idx - refine_range]
+                refine_frames.append((idx, frame))
+                recent.append((idx, frame))
+                continue
+            decayed = decayed + 1 if splash_score < peak_score * decay_ratio else 0
+
+        # Collect frames after the current peak.
+        if peak_idx >= 0 and idx <= peak_idx + refine_range:
+            refine_frames.append((idx, frame))
+        recent.append((idx, frame))
+
+        # Splash has peaked and died down, and the refine window is full: stop early.
+        if (
+            peak_score > 0
+            and peak_area >= min_peak_area
+            and decayed >= decay_window
+            and idx >= peak_idx + refine_range
+        ):
+            print(f"Splash decayed after peak, first pass stopped at frame {idx}")
+            break
+
+    return peak_idx, peak_score, refine_frames, idx + 1
@@ -0,0 +1,180 @@
+"""
+Splash Data Store
+
+Helpers for the JSON files the scoring pipeline shares with the splash scoring API
+(leaderboard.json and stats.json).
+
+Writes go to a temporary file in the same directory which is fsynced and then
+swapped in with os.replace, so a reader always sees either the old or the new
+file, never a truncated one, and a crash mid-write leaves the old file intact.
+Read-modify-write updates hold an exclusive lock on a sidecar .lock file so two
+writers can't lose each other's changes. Readers never take the lock.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def read_json(path, default=None):
+    """
+    Read a JSON file without locking.
+
+    Args:
+        path (str): File to read
+        default: Returned if the file doesn't exist
+
+    Returns:
+        The parsed data, or default
+    """
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def write_json_atomic(path, data):
+    """
+    Replace a JSON file in one step: write to a temp file, fsync, then os.replace.
+
+    Args:
+        path (str): File to write
+        data: JSON-serialisable data
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    # Persist the rename itself (not supported on Windows).
+    if fcntl is not None:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+@contextmanager
+def locked(path):
+    """
+    Hold an exclusive lock for path (on path + ".lock") across processes.
+
+    Args:
+        path (str): File being updated
+    """
+    with open(path + ".lock", "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def update_json(path, update, default=None):
+    """
+    Read-modify-write a JSON file under its lock, replacing it atomically.
+
+    Args:
+        path (str): File to update
+        update (callable): Takes the current data (or default) and returns the new data
+        default: Current data to use if the file doesn't exist
+
+    Returns:
+        The new data as written
+    """
+    with locked(path):
+        data = update(read_json(path, default))
+        write_json_atomic(path, data)
+        return data
+
+
+class JsonFileCache:
+    """
+    In-memory copy of a JSON file, served as ready-to-send response bytes.
+
+    The file is only re-read when its modification time or size changes, or after
+    invalidate() is called, so each request costs one stat() instead of an
+    open/read/parse. The optional transform is applied once per reload (for
+    example rounding scores for display) before the data is serialised.
+    """
+
+    def __init__(self, path, transform=None):
+        self.path = path
+        self._transform = transform
+        self._lock = threading.Lock()
+        self._signature = None
+        self._data = None
+        self._body = None
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self):
+        signature = self._stat_signature()
+        if signature is None:
+            self._signature = self._data = self._body = None
+            return
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            try:
+                data = read_json(self.path)
+            except (OSError, ValueError) as e:
+                # Writers replace the file atomically, so this is a hand-edited or
+                # damaged file: keep serving the last good copy.
+                logger.warning(f"Could not reload {self.path}: {e}")
+                return
+            if self._transform is not None:
+                data = self._transform(data)
+            self._data = data
+            self._body = json.dumps(data).encode()
+            self._signature = signature
+
+    def get(self):
+        """Return the parsed (and transformed) data, or None if the file doesn't exist."""
+        self._refresh()
+        return self._data
+
+    def get_bytes(self):
+        """Return the serialised data, or None if the file doesn't exist."""
+        self._refresh()
+        return self._body
+
+    def invalidate(self):
+        """Force a reload on the next read, for updates made inside the service."""
+        with self._lock:
+            self._signature = None
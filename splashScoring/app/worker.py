@@ -0,0 +1,256 @@
+"""
+ManuMeter Scoring Worker
+
+Long-lived process that loads SAM2 once and keeps the image predictor warm, so
+scoring a jump no longer pays for importing torch and rebuilding the model from
+the checkpoint every time.
+
+Jobs are sent over a local socket (multiprocessing.connection) and handled one at
+a time in the order they arrive. Each job is a dict with the path of the video to
+score; the reply is a dict with the best score or the error that stopped analysis.
+A job can also ask for the recording to be streamed from the Pi (see
+manumeter.PipeCapture) so it is scored while it is still coming in. The job
+only carries the Pi's address and the recording settings; the worker builds and
+validates the ssh/ffmpeg command itself, so a client can't run arbitrary shell
+commands through it.
+With the deferred overlay mode the reply is sent as soon as the score exists and
+the annotated video is rendered afterwards in the background.
+
+The splash scoring API starts this worker on startup. run.py submits jobs to it
+and falls back to running manumeter.py directly when no worker is listening.
+The worker refuses to start unless MANUMETER_WORKER_AUTHKEY is set to a secret
+shared with its clients.
+
+Usage:
+    python worker.py
+"""
+
+import os
+import re
+import shlex
+import sys
+import traceback
+from multiprocessing.connection import Client, Listener
+
+# Local address the worker listens on. Only reachable from this machine.
+WORKER_HOST = "127.0.0.1"
+WORKER_PORT = int(os.getenv("MANUMETER_WORKER_PORT", "6000"))
+WORKER_ADDRESS = (WORKER_HOST, WORKER_PORT)
+# Shared secret between the worker and its clients. There is no default: the
+# worker won't start and clients won't connect without one.
+WORKER_AUTHKEY = os.getenv("MANUMETER_WORKER_AUTHKEY", "").encode() or None
+# The old public default, refused as a secret.
+INSECURE_AUTHKEYS = (b"manumeter",)
+# Seconds a client waits for the worker's reply before giving up on it.
+WORKER_TIMEOUT = float(os.getenv("MANUMETER_WORKER_TIMEOUT", "600"))
+
+# Pi user and host names allowed in a stream job. Neither may start with "-",
+# so they can't be read as ssh options.
+PI_USER_PATTERN = re.compile(r"[a-z_][a-z0-9_-]*")
+PI_HOST_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9.-]*")
+
+
+# Builds the command that streams a recording to this machine as raw frames.
+def stream_cmd(pi_user, pi_host, size, fps, seconds, local_path, source=None):
+    """
+    Build the shell pipeline that records on the Pi and streams it back as raw frames.
+
+    The Pi records with ffmpeg and writes MPEG-TS to stdout over the ssh
+    connection (as live-feed.py does). Locally, ffmpeg saves a copy of the stream
+    to local_path and decodes it to raw bgr24 frames on stdout for the analysis.
+    If source is set, that local file or pipe is streamed in real time instead of
+    the Pi camera.
+
+    Every field is validated or quoted, so none of them can add to the command.
+
+    Args:
+        pi_user (str): User to ssh into the Pi as
+        pi_host (str): Host name or IP of the Pi
+        size (tuple): (width, height) of the recording
+        fps (int): Frame rate of the recording
+        seconds (int): Length of the recording
+        local_path (str): Where to save the local copy of the recording
+        source (str): Local video file or pipe to stream instead of the Pi camera
+
+    Returns:
+        str: Shell command writing raw bgr24 frames to stdout
+
+    Raises:
+        ValueError: If a field isn't valid
+    """
+    width, height = (int(v) for v in size)
+    fps, seconds = int(fps), int(seconds)
+    if min(width, height, fps, seconds) <= 0:
+        raise ValueError("Stream size, fps and seconds must be positive")
+    # Quoting doesn't stop a path starting with "-" being read as an ffmpeg option.
+    if str(local_path).startswith("-") or str(source or "").startswith("-"):
+        raise ValueError("Stream paths can't start with '-'")
+
+    if source:
+        source_cmd = (
+            f"ffmpeg -hide_banner -loglevel error -re "
+            f"-i {shlex.quote(str(source))} -t {seconds} -an "
+            f"-c:v libx264 -pix_fmt yuv420p -preset veryfast -tune zerolatency "
+            f"-f mpegts pipe:1"
+        )
+    else:
+        if not PI_USER_PATTERN.fullmatch(str(pi_user)) or not PI_HOST_PATTERN.fullmatch(str(pi_host)):
+            raise ValueError(f"Invalid Pi address: {pi_user}@{pi_host}")
+        pi_ffmpeg = (
+            f"ffmpeg -hide_banner -loglevel error "
+            f"-f v4l2 "
+            f"-input_format mjpeg "
+            f"-video_size {width}x{height} "
+            f"-i /dev/video0 -t {seconds} "
+            f"-vf eq=brightness=0.05:contrast=1.3:saturation=1.2,fps={fps} "
+            f"-vsync cfr "
+            f"-c:v libx264 -pix_fmt yuv420p "
+            f"-crf 18 -preset veryfast -tune zerolatency "
+            f"-f mpegts pipe:1"
+        )
+        source_cmd = f"ssh {pi_user}@{pi_host} {shlex.quote(pi_ffmpeg)}"
+
+    decode = (
+        f"ffmpeg -hide_banner -loglevel error -y -i pipe:0 "
+        f"-map 0:v -c copy -f mpegts {shlex.quote(str(local_path))} "
+        f"-map 0:v -vf scale={width}:{height} -f rawvideo -pix_fmt bgr24 pipe:1"
+    )
+    return f"{source_cmd} | {decode}"
+
+
+# Scores a single job with the warm predictor.
+def handle_job(job, predictor):
+    """
+    Run the splash analysis for one job.
+
+    Args:
+        job (dict): {"video": str} path of the video to analyse, or
+            {"stream": {...}} stream_cmd() arguments of a recording to stream from the Pi,
+            plus an optional "overlay" mode (see manumeter.process_video())
+        predictor (SAM2ImagePredictor): Loaded predictor reused for every job
+
+    Returns:
+        dict: {"ok": True, "score": float or None} on success,
+              {"ok": False, "error": str} if analysis raised
+    """
+    import manumeter
+
+    try:
+        if "stream" in job:
+            stream = job["stream"]
+            cmd = stream_cmd(
+                stream["pi_user"], stream["pi_host"], stream["size"], stream["fps"],
+                stream["seconds"], stream["local_path"], stream.get("source"),
+            )
+            width, height = (int(v) for v in stream["size"])
+            fps, seconds = int(stream["fps"]), int(stream["seconds"])
+            video = manumeter.PipeCapture(cmd, width, height, fps, fps * seconds)
+        else:
+            video = job["video"]
+        score = manumeter.process_video(
+            video,
+            manumeter.INPUT_BOX,
+            predictor=predictor,
+            overlay=job.get("overlay", manumeter.OVERLAY_MODE),
+        )
+        return {"ok": True, "score": score}
+    except Exception as e:
+        traceback.print_exc()
+        return {"ok": False, "error": str(e)}
+
+
+# Main worker loop.
+def serve(address=WORKER_ADDRESS, authkey=WORKER_AUTHKEY):
+    """
+    Load SAM2 once, then accept and score jobs until the process is stopped.
+
+    Args:
+        address (tuple): (host, port) to listen on
+        authkey (bytes): Shared secret clients must present
+    """
+    if not authkey or authkey in INSECURE_AUTHKEYS:
+        sys.exit("Refusing to start: set MANUMETER_WORKER_AUTHKEY to a secret shared with run.py")
+
+    # Heavy imports (torch, sam2) happen once here rather than per jump.
+    import manumeter
+
+    predictor = manumeter.load_predictor()
+    print(f"Scoring worker ready on {address[0]}:{address[1]}")
+
+    with Listener(address, authkey=authkey) as listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"Rejected connection: {e}")
+                continue
+            # A client that disconnects or is killed mid-job (e.g. by run.py's stage
+            # timeout) must not take the warm worker down with it.
+            try:
+                with conn:
+                    job = conn.recv()
+                    print(f"Scoring job: {job}")
+                    conn.send(handle_job(job, predictor))
+            except (OSError, EOFError) as e:
+                print(f"Lost connection to client: {e!r}")
+                continue
+
+
+# Client side, used by run.py.
+def submit(video_path, overlay=None, address=WORKER_ADDRESS, authkey=WORKER_AUTHKEY, timeout=WORKER_TIMEOUT):
+    """
+    Send a video to the running worker and wait for its result.
+
+    Args:
+        video_path (str): Path to the video to score, as seen by the worker
+        overlay (str): Overlay mode for this job, the worker's default if None
+        address (tuple): (host, port) of the worker
+        authkey (bytes): Shared secret of the worker
+        timeout (float): Seconds to wait for the reply
+
+    Returns:
+        dict: The worker's reply, see handle_job()
+
+    Raises:
+        ConnectionError: If no worker is listening at the address
+        TimeoutError: If the worker doesn't reply within timeout
+    """
+    return _send({"video": os.path.abspath(video_path)}, overlay, address, authkey, timeout)
+
+
+def submit_stream(stream, overlay=None, address=WORKER_ADDRESS, authkey=WORKER_AUTHKEY, timeout=WORKER_TIMEOUT):
+    """
+    Have the worker record on the Pi and score the frames as they arrive.
+
+    Args:
+        stream (dict): stream_cmd() arguments: pi_user, pi_host, size, fps, seconds,
+            local_path and optionally source
+        overlay (str): Overlay mode for this job, the worker's default if None
+        address (tuple): (host, port) of the worker
+        authkey (bytes): Shared secret of the worker
+        timeout (float): Seconds to wait for the reply
+
+    Returns:
+        dict: The worker's reply, see handle_job()
+
+    Raises:
+        ConnectionError: If no worker is listening at the address
+        TimeoutError: If the worker doesn't reply within timeout
+    """
+    return _send({"stream": stream}, overlay, address, authkey, timeout)
+
+
+def _send(job, overlay, address, authkey, timeout):
+    if not authkey:
+        raise ConnectionError("MANUMETER_WORKER_AUTHKEY is not set")
+    with Client(address, authkey=authkey) as conn:
+        if overlay is not None:
+            job["overlay"] = overlay
+        conn.send(job)
+        if not conn.poll(timeout):
+            raise TimeoutError(f"Scoring worker didn't reply within {timeout:g}s")
+        return conn.recv()
+
+
+if __name__ == "__main__":
+    serve()
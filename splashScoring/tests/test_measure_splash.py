@@ -0,0 +1,88 @@
+"""measure_splash must give the same results as the contour based version it replaced."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+import benchmark
+import scoring
+
+SHAPE = (720, 1280)
+
+
+def blank():
+    return np.zeros(SHAPE, dtype=bool)
+
+
+def single_pixel():
+    mask = blank()
+    mask[360, 427] = True
+    return mask
+
+
+def corner_pixel():
+    mask = blank()
+    mask[0, 0] = True
+    return mask
+
+
+def l_shape():
+    mask = blank()
+    mask[100:400, 200:240] = True
+    mask[360:400, 200:600] = True
+    return mask
+
+
+def ring():
+    mask = np.zeros(SHAPE, dtype=np.uint8)
+    cv2.circle(mask, (640, 360), 150, 1, 25)
+    return mask.astype(bool)
+
+
+def c_shape():
+    mask = np.zeros(SHAPE, dtype=np.uint8)
+    cv2.ellipse(mask, (500, 300), (120, 200), 0, 40, 320, 1, 30)
+    return mask
+
+
+def two_blobs():
+    mask = np.zeros(SHAPE, dtype=np.uint8)
+    cv2.circle(mask, (200, 200), 40, 1, -1)
+    cv2.rectangle(mask, (900, 500), (1000, 650), 1, -1)
+    return mask.astype(bool)
+
+
+def scattered_pixels():
+    mask = blank()
+    mask[[5, 300, 719, 42], [1279, 2, 640, 900]] = True
+    return mask
+
+
+def full_frame():
+    return np.ones(SHAPE, dtype=bool)
+
+
+@pytest.mark.parametrize(
+    "mask",
+    [blank(), single_pixel(), corner_pixel(), l_shape(), ring(), c_shape(), two_blobs(), scattered_pixels(), full_frame()],
+    ids=["empty", "single_pixel", "corner_pixel", "l_shape", "ring", "c_shape", "two_blobs", "scattered", "full"],
+)
+def test_matches_contour_version(mask):
+    assert scoring.measure_splash(mask) == benchmark.legacy_measure_splash(mask)
+
+
+def test_matches_contour_version_on_random_masks():
+    for mask in benchmark.sample_masks(50, SHAPE, seed=1):
+        assert scoring.measure_splash(mask) == benchmark.legacy_measure_splash(mask)
+
+
+def test_accepts_non_bool_masks():
+    mask = two_blobs()
+    expected = benchmark.legacy_measure_splash(mask)
+    assert scoring.measure_splash(mask.astype(np.uint8)) == expected
+    assert scoring.measure_splash(mask.astype(np.float32)) == expected